@@ -36,10 +36,23 @@ training【488993241644590†L61-L70】.  The model can be loaded using the
 
 from __future__ import annotations
 import math
+import threading
 import numpy as np
 import pandas as pd
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Default Hugging Face model identifier for the Chronos‑2 pipeline.
+CHRONOS_MODEL_ID = "amazon/chronos-2"
+
+# Pipelines loaded by ``load_pipeline``, keyed by (model_id, device).  A
+# process that forks after populating this cache hands the weights to its
+# children copy‑on‑write instead of each child reloading them.
+_PIPELINE_CACHE: Dict[Tuple[str, str], Any] = {}
+# Guards cache fills, so concurrent first calls load the model only once.
+_PIPELINE_LOCK = threading.Lock()
 
 
 @dataclass
@@ -208,6 +221,41 @@ def max_drawdown(series: np.ndarray) -> float:
     return float(np.max(drawdowns))
 
 
+def _quantile_columns(forecast: pd.DataFrame) -> List[Tuple[float, str]]:
+    """Find the quantile columns of a wide‑format forecast.
+
+    Candidate columns are identified by numeric values in their names.  For
+    example, columns named "0.1", "quantile_0.5" or "p0.75" will all be
+    detected.  Obvious metadata columns are excluded.
+
+    Returns
+    -------
+    list of (float, str)
+        ``(quantile_level, column_name)`` pairs in column order.
+    """
+    import re
+    candidate_cols: List[Tuple[float, str]] = []
+    for col in forecast.columns:
+        # Skip standard metadata columns
+        if col in {"id", "timestamp", "target"}:
+            continue
+        # Try to interpret the entire column name as a float
+        val = None  # type: Optional[float]
+        try:
+            val = float(col)
+        except Exception:
+            # Look for a numeric substring within the column name
+            match = re.search(r"(\d+\.?\d*)", col)
+            if match:
+                try:
+                    val = float(match.group(1))
+                except Exception:
+                    val = None
+        if val is not None:
+            candidate_cols.append((val, col))
+    return candidate_cols
+
+
 def expected_max_drawdown(
     forecast: pd.DataFrame,
     quantile_level: float = 0.5,
@@ -253,29 +301,7 @@ def expected_max_drawdown(
         return float(np.mean(mdd_values)) if mdd_values else 0.0
 
     # Otherwise, treat the DataFrame as wide format
-    # Identify candidate quantile columns based on numeric values in the
-    # column names.  For example, columns named "0.1", "quantile_0.5" or
-    # "p0.75" will all be detected.  Exclude obvious metadata columns.
-    import re
-    candidate_cols: List[Tuple[float, str]] = []
-    for col in forecast.columns:
-        # Skip standard metadata columns
-        if col in {"id", "timestamp", "target"}:
-            continue
-        # Try to interpret the entire column name as a float
-        val = None  # type: Optional[float]
-        try:
-            val = float(col)
-        except Exception:
-            # Look for a numeric substring within the column name
-            match = re.search(r"(\d+\.?\d*)", col)
-            if match:
-                try:
-                    val = float(match.group(1))
-                except Exception:
-                    val = None
-        if val is not None:
-            candidate_cols.append((val, col))
+    candidate_cols = _quantile_columns(forecast)
 
     # If we found candidate quantile columns, choose the one closest to the
     # requested quantile level; otherwise fall back to 'target' if available
@@ -316,17 +342,300 @@ def expected_max_drawdown(
 
     return float(np.mean(mdd_values)) if mdd_values else 0.0
 
+
+def forecast_quantile_paths(
+    forecast: pd.DataFrame,
+    quantile_levels: List[float],
+    ) -> Tuple[List[object], np.ndarray]:
+    """Stack the forecast paths of several quantile levels into one array.
+
+    Both forecast layouts accepted by ``expected_max_drawdown`` are
+    supported.  In wide format each requested level is mapped to the
+    closest quantile column, as ``expected_max_drawdown`` does for a single
+    level.
+
+    Parameters
+    ----------
+    forecast : pandas.DataFrame
+        Data frame returned by ``Chronos2Pipeline.predict_df``.
+    quantile_levels : list of float
+        Quantile levels to extract.
+
+    Returns
+    -------
+    ids : list
+        Series identifiers, in the order of the first axis of ``paths``.
+    paths : np.ndarray
+        Array of shape ``(n_series, len(quantile_levels), horizon)`` with
+        the forecast log‑prices, time‑ordered along the last axis.
+
+    Raises
+    ------
+    ValueError
+        If a requested quantile level is not present in the forecast.
+    """
+    if "id" in forecast.columns:
+        groups = list(forecast.groupby("id"))
+    else:
+        groups = [(None, forecast)]
+
+    ids: List[object] = []
+    stacked: List[np.ndarray] = []
+
+    if "quantile" in forecast.columns:
+        for series_id, group in groups:
+            rows = []
+            for q in quantile_levels:
+                df_q = group[np.isclose(group["quantile"].astype(float), q)]
+                if df_q.empty:
+                    raise ValueError(f"Quantile {q} not found in forecast.")
+                rows.append(df_q.sort_values("timestamp")["target"].astype(float).to_numpy())
+            ids.append(series_id)
+            stacked.append(np.vstack(rows))
+        return ids, np.stack(stacked)
+
+    candidate_cols = _quantile_columns(forecast)
+    if not candidate_cols:
+        raise ValueError(
+            f"No quantile columns found in forecast. Columns: {list(forecast.columns)}"
+        )
+    selected = [
+        min(candidate_cols, key=lambda c: abs(c[0] - q))[1] for q in quantile_levels
+    ]
+    for series_id, group in groups:
+        if "timestamp" in group.columns:
+            group = group.sort_values("timestamp")
+        ids.append(series_id)
+        stacked.append(group[selected].astype(float).to_numpy().T)
+    return ids, np.stack(stacked)
+
+
+def max_drawdown_prefixes(paths: np.ndarray) -> np.ndarray:
+    """Maximum drawdown of every prefix of one or more log‑price paths.
+
+    Vectorised counterpart of ``max_drawdown``: element ``[..., h]`` of the
+    result equals ``max_drawdown(paths[..., :h + 1])``, so a single pass
+    gives the drawdown for every holding period up to the path length.
+
+    Parameters
+    ----------
+    paths : np.ndarray
+        Array of log‑prices with time along the last axis.
+
+    Returns
+    -------
+    np.ndarray
+        Array of the same shape holding the prefix maximum drawdowns.
+    """
+    prices = np.exp(paths)
+    running_max = np.maximum.accumulate(prices, axis=-1)
+    drawdowns = 1.0 - prices / running_max
+    return np.maximum.accumulate(drawdowns, axis=-1)
+
+
 def risk_score_from_drawdown(mdd: float) -> int:
     # Hàm căn bậc hai: mdd 4,29% → ~20; mdd 0,4% → ~6
     score = 100 * math.sqrt(mdd)
     return int(min(100, score))
 
 
+def risk_scores_from_drawdowns(mdd: np.ndarray) -> np.ndarray:
+    """Vectorised ``risk_score_from_drawdown`` for an array of drawdowns."""
+    scores = np.floor(100 * np.sqrt(np.asarray(mdd, dtype=float)))
+    return np.minimum(100, scores).astype(int)
+
+
+def _interpolate_quantiles(
+    fan: np.ndarray,
+    z_levels: np.ndarray,
+    z: np.ndarray,
+    ) -> np.ndarray:
+    """Evaluate per‑step quantile functions at normal scores ``z``.
+
+    ``fan`` has shape ``(n_series, n_quantiles, horizon)`` with the
+    quantiles sorted along the second axis; ``z_levels`` are the normal
+    scores of those quantile levels.  ``z`` has shape ``(n, horizon)`` and
+    column ``t`` is evaluated against step ``t``.  Interpolation is linear
+    in ``z`` and extrapolated with the end slopes, so a Gaussian marginal
+    is reproduced exactly, tails included.  Returns ``(n_series, n,
+    horizon)``.
+    """
+    k = np.clip(np.searchsorted(z_levels, z) - 1, 0, z_levels.size - 2)
+    w = (z - z_levels[k]) / (z_levels[k + 1] - z_levels[k])
+    steps = np.arange(fan.shape[2])[None, :]
+    lower = fan[:, k, steps]
+    return lower + w[None] * (fan[:, k + 1, steps] - lower)
+
+
+def tail_risk_metrics(
+    paths: np.ndarray,
+    quantile_levels: List[float],
+    entry_prices: np.ndarray,
+    stop_loss_pcts: np.ndarray,
+    cvar_level: float = 0.9,
+    n_scenarios: int = 2000,
+    seed: int = 0,
+    ) -> Dict[str, np.ndarray]:
+    """Drawdown tail statistics from the full quantile fan of a forecast.
+
+    ``expected_max_drawdown`` keeps one quantile path and discards the
+    rest.  Here the fan is read as the per‑step **marginal** distribution
+    of the log‑price and scenario paths are rebuilt from independent
+    per‑step increments, so path‑dependent statistics (drawdown, touching
+    the stop) see the full intra‑horizon variability instead of the much
+    smoother paths that follow one quantile throughout.
+
+    For each step ``t`` the quantile function ``Q_t`` is interpolated in
+    normal‑score space, its median ``m_t`` and scale ``s_t`` (slope of the
+    quantiles against their normal scores) are taken from the fan, and the
+    increment from ``t - 1`` to ``t`` is drawn as
+
+        (m_t − m_{t−1}) + c_t · (Q_t(Z) − m_t),   c_t = √(s_t² − s_{t−1}²) / s_t
+
+    i.e. with the shape of the step‑``t`` marginal, scaled so that the
+    variances of the increments add up to the marginal variance.  For a
+    Gaussian random walk this recovers the true increments exactly.  The
+    first step is drawn directly from ``Q_1``.  One fixed, seeded normal
+    innovation matrix ``Z`` of shape ``(n_scenarios, horizon)`` is shared
+    by all series, and every statistic is computed in one vectorised pass
+    over all series, scenarios and steps.
+
+    Parameters
+    ----------
+    paths : np.ndarray
+        Forecast log‑prices of shape ``(n_series, n_quantiles, horizon)``,
+        e.g. from ``forecast_quantile_paths``.
+    quantile_levels : list of float
+        Quantile level of each entry along the second axis of ``paths``,
+        strictly between 0 and 1.  Levels far in the tails (0.01, 0.99)
+        keep the tail of the rebuilt distribution from being pure
+        extrapolation.
+    entry_prices : np.ndarray
+        Entry price per series (same units as the forecast prices).
+    stop_loss_pcts : np.ndarray
+        Stop‑loss threshold per series as a fraction (e.g. 0.06).
+    cvar_level : float, default 0.9
+        Confidence level of the drawdown CVaR: the mean of the worst
+        ``1 - cvar_level`` share of scenarios.
+    n_scenarios : int, default 2000
+        Number of simulated scenario paths.
+    seed : int, default 0
+        Seed of the innovation matrix, so repeated calls on the same
+        forecast return the same statistics.
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        Arrays of length ``n_series``: ``expected_mdd``, ``cvar_mdd`` and
+        ``p_stop_loss``, the share of scenarios whose **daily** log‑price
+        falls to ``entry_price × (1 − stop_loss_pct)`` or below at some
+        step within the horizon (moves inside a step are not seen, so this
+        is a lower bound of the continuous touch probability).
+    """
+    levels = np.asarray(quantile_levels, dtype=float)
+    order = np.argsort(levels)
+    levels = levels[order]
+    if levels.size < 2:
+        raise ValueError("At least two quantile levels are needed for tail metrics.")
+    if levels[0] <= 0.0 or levels[-1] >= 1.0:
+        raise ValueError("Quantile levels must lie strictly between 0 and 1.")
+    # Sort along the quantile axis as well: model quantiles can cross slightly
+    fan = np.sort(np.asarray(paths, dtype=float)[:, order, :], axis=1)
+    n_series, _, horizon = fan.shape
+
+    normal = NormalDist()
+    z_levels = np.array([normal.inv_cdf(q) for q in levels])
+    median = _interpolate_quantiles(fan, z_levels, np.zeros((1, horizon)))[:, 0, :]
+
+    # Marginal scale per step: least‑squares slope of quantiles on scores
+    z_centred = z_levels - z_levels.mean()
+    scale = np.einsum("q,sqh->sh", z_centred, fan) / np.dot(z_centred, z_centred)
+    scale = np.maximum(scale, 0.0)
+    prev_var = np.concatenate([np.zeros((n_series, 1)), scale[:, :-1] ** 2], axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shrink = np.sqrt(np.maximum(scale ** 2 - prev_var, 0.0)) / scale
+    shrink = np.where(scale > 0, shrink, 0.0)
+    shrink[:, 0] = 1.0
+
+    innovations = np.random.default_rng(seed).standard_normal((n_scenarios, horizon))
+    draws = _interpolate_quantiles(fan, z_levels, innovations)  # (n_series, n_scenarios, horizon)
+    drift = np.diff(median, axis=1, prepend=0.0)
+    increments = drift[:, None, :] + shrink[:, None, :] * (draws - median[:, None, :])
+    scenarios = np.cumsum(increments, axis=2)
+
+    mdd = max_drawdown_prefixes(scenarios)[..., -1]  # (n_series, n_scenarios)
+    expected_mdd = mdd.mean(axis=1)
+    n_tail = max(1, int(math.ceil((1.0 - cvar_level) * n_scenarios)))
+    cvar_mdd = np.sort(mdd, axis=1)[:, -n_tail:].mean(axis=1)
+
+    stop_log = np.log(np.asarray(entry_prices, dtype=float)) + np.log1p(
+        -np.asarray(stop_loss_pcts, dtype=float)
+    )
+    breached = scenarios.min(axis=2) <= stop_log[:, None]
+    p_stop_loss = breached.mean(axis=1)
+
+    return {
+        "expected_mdd": expected_mdd,
+        "cvar_mdd": cvar_mdd,
+        "p_stop_loss": p_stop_loss,
+    }
+
+
+def load_pipeline(
+    model_id: str = CHRONOS_MODEL_ID,
+    device: str = "cpu",
+    ) -> Any:
+    """Load a Chronos‑2 pipeline once per process and cache it.
+
+    ``from_pretrained`` reads the safetensors checkpoint, which is
+    memory‑mapped by the Hugging Face loader, so the first call is the
+    only one that pays for I/O and allocation.  Subsequent calls with the
+    same arguments return the cached object.  The cache fill is locked, so
+    threads racing on the first call share one load.
+
+    Parameters
+    ----------
+    model_id : str, default CHRONOS_MODEL_ID
+        Hugging Face model identifier or local checkpoint directory.
+    device : str, default "cpu"
+        Device for inference ("cpu" or "cuda").
+
+    Returns
+    -------
+    Chronos2Pipeline
+        The loaded (possibly cached) pipeline.
+
+    Raises
+    ------
+    ImportError
+        If chronos‑forecasting is not installed.
+    """
+    key = (model_id, device)
+    pipeline = _PIPELINE_CACHE.get(key)
+    if pipeline is not None:
+        return pipeline
+
+    try:
+        from chronos import Chronos2Pipeline  # type: ignore
+    except ImportError as exc:
+        raise ImportError(
+            "chronos‑forecasting is not installed. Install with pip install 'chronos‑forecasting>=2.0'"
+        ) from exc
+
+    with _PIPELINE_LOCK:
+        pipeline = _PIPELINE_CACHE.get(key)
+        if pipeline is None:
+            pipeline = Chronos2Pipeline.from_pretrained(model_id, device_map=device)
+            _PIPELINE_CACHE[key] = pipeline
+    return pipeline
+
+
 def compute_risk_score(
     ohlc: pd.DataFrame,
     strategy: StrategyConfig,
     quantile_levels: Optional[List[float]] = None,
     device: str = "cpu",
+    pipeline: Optional[Any] = None,
     ) -> Tuple[int, float]:
     """Compute the behavioural risk score for a single asset using Chronos‑2.
 
@@ -354,6 +663,9 @@ def compute_risk_score(
     device : str, default "cpu"
         Device for inference ("cpu" or "cuda").  Requires an appropriate
         environment and hardware.
+    pipeline : Chronos2Pipeline, optional
+        Pre‑loaded pipeline to use.  When omitted the process‑wide cached
+        pipeline from ``load_pipeline`` is used.
 
     Returns
     -------
@@ -369,16 +681,8 @@ def compute_risk_score(
     ts_df = prepare_time_series(ohlc)
 
     # 2. Load Chronos‑2 pipeline (requires chronos‑forecasting package)
-    try:
-        from chronos import Chronos2Pipeline  # type: ignore
-    except ImportError as exc:
-        raise ImportError(
-            "chronos‑forecasting is not installed. Install with pip install 'chronos‑forecasting>=2.0'"
-        ) from exc
-
-    pipeline = Chronos2Pipeline.from_pretrained(
-        "amazon/chronos-2", device_map=device
-    )
+    if pipeline is None:
+        pipeline = load_pipeline(device=device)
 
     # 3. Define quantiles and prediction length (horizon)
     if quantile_levels is None:
@@ -401,6 +705,281 @@ def compute_risk_score(
     return score, mdd_estimate
 
 
+def compute_risk_scores_batch(
+    ohlc_dict: Dict[str, pd.DataFrame],
+    holding_period_days: int,
+    quantile_levels: Optional[List[float]] = None,
+    device: str = "cpu",
+    pipeline: Optional[Any] = None,
+    ) -> Dict[str, Tuple[int, float]]:
+    """Score several assets that share a holding period in one forecast call.
+
+    The series are stacked into a single long‑format frame (one ``id`` per
+    symbol) and forecast with one ``predict_df`` call.  Each symbol's
+    forecast is then scored exactly as in ``compute_risk_score``.
+
+    Parameters
+    ----------
+    ohlc_dict : dict[str, pd.DataFrame]
+        Mapping of symbol to OHLC data indexed by datetime with a `close`
+        column.
+    holding_period_days : int
+        Forecast horizon shared by all symbols.
+    quantile_levels : list of float, optional
+        Quantile levels to request from the model.
+    device : str, default "cpu"
+        Device for inference ("cpu" or "cuda").
+    pipeline : Chronos2Pipeline, optional
+        Pre‑loaded pipeline; defaults to ``load_pipeline(device=device)``.
+
+    Returns
+    -------
+    dict[str, tuple[int, float]]
+        Mapping of symbol to ``(risk_score, mdd)``.
+    """
+    if not ohlc_dict:
+        return {}
+
+    frames = []
+    for symbol, ohlc in ohlc_dict.items():
+        ts_df = prepare_time_series(ohlc[["close"]])
+        ts_df["id"] = symbol
+        frames.append(ts_df)
+    ts_all = pd.concat(frames, ignore_index=True)
+
+    if pipeline is None:
+        pipeline = load_pipeline(device=device)
+    if quantile_levels is None:
+        quantile_levels = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+    forecast_df = pipeline.predict_df(
+        ts_all,
+        prediction_length=int(holding_period_days),
+        quantile_levels=quantile_levels,
+        id_column="id",
+        timestamp_column="timestamp",
+        target="target",
+    )
+
+    results: Dict[str, Tuple[int, float]] = {}
+    for symbol, group in forecast_df.groupby("id"):
+        mdd_estimate = expected_max_drawdown(group, quantile_level=0.5)
+        results[symbol] = (risk_score_from_drawdown(mdd_estimate), mdd_estimate)
+    return results
+
+
+def compute_risk_surface(
+    ohlc: pd.DataFrame,
+    holding_periods: List[int],
+    quantile_levels: Optional[List[float]] = None,
+    device: str = "cpu",
+    pipeline: Optional[Any] = None,
+    ) -> pd.DataFrame:
+    """Risk score and E[MDD] over a grid of holding periods × quantiles.
+
+    Used for what‑if planning: instead of one ``compute_risk_score`` call
+    per (holding period, quantile) cell, the asset is forecast **once** at
+    the longest requested horizon and the drawdown of every prefix of
+    every quantile path is computed in a single vectorised pass
+    (``max_drawdown_prefixes``).  The cell for holding period ``h`` is the
+    drawdown of the first ``h`` forecast steps, which is what
+    ``compute_risk_score`` computes for ``holding_period_days=h`` up to
+    the model's own horizon dependence.
+
+    Parameters
+    ----------
+    ohlc : pandas.DataFrame
+        Input OHLC data indexed by datetime.  Must include a `close` column.
+    holding_periods : list of int
+        Holding periods (in trading days) to evaluate.
+    quantile_levels : list of float, optional
+        Quantile levels to evaluate.  Defaults to the levels requested by
+        ``compute_risk_score``.
+    device : str, default "cpu"
+        Device for inference ("cpu" or "cuda").
+    pipeline : Chronos2Pipeline, optional
+        Pre‑loaded pipeline; defaults to ``load_pipeline(device=device)``.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per (holding period, quantile) with columns
+        ``holding_period_days``, ``quantile_level``, ``mdd`` and
+        ``risk_score``.
+    """
+    if not holding_periods or min(holding_periods) < 1:
+        raise ValueError("holding_periods must contain positive integers.")
+    if quantile_levels is None:
+        quantile_levels = [0.1, 0.25, 0.5, 0.75, 0.9]
+    horizons = np.asarray(sorted(set(int(h) for h in holding_periods)))
+
+    ts_df = prepare_time_series(ohlc[["close"]])
+    if pipeline is None:
+        pipeline = load_pipeline(device=device)
+    forecast_df = pipeline.predict_df(
+        ts_df,
+        prediction_length=int(horizons[-1]),
+        quantile_levels=list(quantile_levels),
+        id_column="id",
+        timestamp_column="timestamp",
+        target="target",
+    )
+
+    # paths: (n_series, Q, H) -> prefix MDDs averaged over series -> (Q, H)
+    _, paths = forecast_quantile_paths(forecast_df, list(quantile_levels))
+    mdd_grid = max_drawdown_prefixes(paths).mean(axis=0)[:, horizons - 1]
+    score_grid = risk_scores_from_drawdowns(mdd_grid)
+
+    n_q, n_h = mdd_grid.shape
+    return pd.DataFrame({
+        "holding_period_days": np.tile(horizons, n_q),
+        "quantile_level": np.repeat(np.asarray(quantile_levels, dtype=float), n_h),
+        "mdd": mdd_grid.ravel(),
+        "risk_score": score_grid.ravel(),
+    })
+
+
+@dataclass
+class TailRiskResult:
+    """Legacy score together with the tail statistics of the same forecast.
+
+    Attributes
+    ----------
+    risk_score : int
+        Legacy behavioural risk score (median path), as returned by
+        ``compute_risk_score``.
+    mdd : float
+        Legacy E[MDD] of the median path.
+    expected_mdd : float
+        E[MDD] over the distribution rebuilt from all quantiles.
+    cvar_mdd : float
+        Mean maximum drawdown of the worst ``1 - cvar_level`` scenarios.
+    p_stop_loss : float
+        Share of scenarios whose daily price reaches the stop‑loss price
+        within the horizon (see ``tail_risk_metrics``).
+    """
+
+    risk_score: int
+    mdd: float
+    expected_mdd: float
+    cvar_mdd: float
+    p_stop_loss: float
+
+
+def compute_tail_risk_score(
+    ohlc: pd.DataFrame,
+    strategy: StrategyConfig,
+    quantile_levels: Optional[List[float]] = None,
+    cvar_level: float = 0.9,
+    device: str = "cpu",
+    pipeline: Optional[Any] = None,
+    ) -> TailRiskResult:
+    """Score an asset from the full quantile fan of one forecast.
+
+    Makes the same single forecast call as ``compute_risk_score`` and
+    returns the legacy median‑path score together with E[MDD], drawdown
+    CVaR and the stop‑loss breach probability from ``tail_risk_metrics``,
+    so no extra forecast calls are needed to probe other quantiles.
+
+    Parameters
+    ----------
+    ohlc : pandas.DataFrame
+        Input OHLC data indexed by datetime.  Must include a `close` column.
+    strategy : StrategyConfig
+        Investor strategy; uses ``holding_period_days``, ``entry_price``
+        and ``stop_loss_pct``.
+    quantile_levels : list of float, optional
+        Quantile levels to request.  Must include 0.5 for the legacy
+        score and lie strictly between 0 and 1.  Defaults to 0.01, 0.05,
+        the deciles 0.1–0.9, 0.95 and 0.99, so that the drawdown CVaR
+        rests on forecast tail quantiles rather than on extrapolation.
+    cvar_level : float, default 0.9
+        Confidence level of the drawdown CVaR.
+    device : str, default "cpu"
+        Device for inference ("cpu" or "cuda").
+    pipeline : Chronos2Pipeline, optional
+        Pre‑loaded pipeline; defaults to ``load_pipeline(device=device)``.
+
+    Returns
+    -------
+    TailRiskResult
+        Legacy score and tail statistics.
+    """
+    if quantile_levels is None:
+        quantile_levels = [
+            0.01, 0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 0.99,
+        ]
+    if not any(np.isclose(q, 0.5) for q in quantile_levels):
+        raise ValueError("quantile_levels must include 0.5 for the legacy score.")
+
+    ts_df = prepare_time_series(ohlc[["close"]])
+    if pipeline is None:
+        pipeline = load_pipeline(device=device)
+    forecast_df = pipeline.predict_df(
+        ts_df,
+        prediction_length=int(strategy.holding_period_days),
+        quantile_levels=list(quantile_levels),
+        id_column="id",
+        timestamp_column="timestamp",
+        target="target",
+    )
+
+    mdd_estimate = expected_max_drawdown(forecast_df, quantile_level=0.5)
+    _, paths = forecast_quantile_paths(forecast_df, list(quantile_levels))
+    tail = tail_risk_metrics(
+        paths,
+        list(quantile_levels),
+        entry_prices=np.full(len(paths), strategy.entry_price),
+        stop_loss_pcts=np.full(len(paths), strategy.stop_loss_pct),
+        cvar_level=cvar_level,
+    )
+    return TailRiskResult(
+        risk_score=risk_score_from_drawdown(mdd_estimate),
+        mdd=mdd_estimate,
+        expected_mdd=float(tail["expected_mdd"].mean()),
+        cvar_mdd=float(tail["cvar_mdd"].mean()),
+        p_stop_loss=float(tail["p_stop_loss"].mean()),
+    )
+
+
+def historical_risk_score(
+    ohlc: pd.DataFrame,
+    strategy: StrategyConfig,
+    quantile_levels: Optional[List[float]] = None,
+    device: str = "cpu",
+    pipeline: Optional[Any] = None,
+    ) -> Tuple[int, float]:
+    """Cheap fallback score from the realised drawdown, without a forecast.
+
+    Uses the maximum drawdown of the last ``holding_period_days`` closes as
+    a stand‑in for E[MDD] and maps it with ``risk_score_from_drawdown``.
+    It needs no model and runs in microseconds, so it is the degraded path
+    when the forecasting path is overloaded.
+
+    Parameters
+    ----------
+    ohlc : pandas.DataFrame
+        Input OHLC data indexed by datetime.  Must include a `close` column.
+    strategy : StrategyConfig
+        Investor strategy parameters including holding period.
+    quantile_levels, device, pipeline
+        Accepted and ignored, so that any call to ``compute_risk_score``
+        can be answered by this function instead.
+
+    Returns
+    -------
+    risk_score : int
+        Behavioural risk score on a 0–100 scale.
+    mdd : float
+        Realised maximum drawdown over the trailing window.
+    """
+    ts_df = prepare_time_series(ohlc[["close"]])
+    window = max(2, int(strategy.holding_period_days) + 1)
+    log_prices = ts_df.sort_values("timestamp")["target"].to_numpy()[-window:]
+    mdd = max_drawdown(log_prices) if len(log_prices) else 0.0
+    return risk_score_from_drawdown(mdd), mdd
+
+
 def compute_portfolio_risk_score(
     ohlc_dict: Dict[str, pd.DataFrame],
     strategy_dict: Dict[str, StrategyConfig],
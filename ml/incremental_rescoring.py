@@ -0,0 +1,383 @@
+"""
+incremental_rescoring
+---------------------
+
+Event‑driven rescoring that only recomputes the forecasts touched by new
+bars.
+
+A full scoring run recomputes every strategy from scratch.  On a trading
+day only a few tickers update at a time, so ``IncrementalRescorer`` keeps
+the latest score per (symbol, horizon) and, when new bars arrive for a
+symbol, marks just that symbol's horizons dirty.  Dirty keys are
+recomputed in batches after a debounce interval (one forecast call per
+horizon, via ``compute_risk_scores_batch``) and the resulting score
+changes are published to subscribers as ``ScoreDelta`` objects, either
+through callbacks or a ``queue.Queue``.
+
+Scoring cost is therefore proportional to the number of symbols that
+changed, not to the size of the universe.
+
+Example
+-------
+>>> rescorer = IncrementalRescorer(ohlc_df, strategies, debounce_s=2.0)
+>>> rescorer.subscribe(lambda d: print(d.symbol, d.old_score, "->", d.new_score))
+>>> rescorer.prime()
+>>> rescorer.start()
+>>> rescorer.on_bars("FPT", new_bars)   # recomputed ~2 s later
+>>> rescorer.stop()
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from chronos_risk_template import StrategyConfig, compute_risk_scores_batch
+
+# (symbol, holding_period_days)
+ScoreKey = Tuple[str, int]
+
+# Signature of the batch scoring function: symbol -> OHLC frame for one
+# horizon, returning symbol -> (risk_score, mdd).
+BatchScoreFn = Callable[[Dict[str, pd.DataFrame], int], Dict[str, Tuple[int, float]]]
+
+
+@dataclass
+class ScoreDelta:
+    """Change in the risk score of one (symbol, horizon) forecast.
+
+    Attributes
+    ----------
+    symbol : str
+        Ticker symbol.
+    horizon : int
+        Holding period in trading days.
+    old_score : int or None
+        Previous score, or ``None`` on the first computation.
+    new_score : int
+        Recomputed score.
+    old_mdd : float or None
+        Previous expected maximum drawdown.
+    new_mdd : float
+        Recomputed expected maximum drawdown.
+    as_of : pandas.Timestamp
+        Timestamp of the latest bar used for the new score.
+    """
+
+    symbol: str
+    horizon: int
+    old_score: Optional[int]
+    new_score: int
+    old_mdd: Optional[float]
+    new_mdd: float
+    as_of: pd.Timestamp
+
+    @property
+    def delta(self) -> int:
+        """Score change (the full new score on the first computation)."""
+        return self.new_score - (self.old_score or 0)
+
+
+class IncrementalRescorer:
+    """Keep per‑(symbol, horizon) risk scores up to date as bars arrive.
+
+    Parameters
+    ----------
+    ohlc : pandas.DataFrame
+        Initial history in the ``load_ohlc`` layout (datetime index,
+        ``symbol`` and ``close`` columns).
+    strategies : list of StrategyConfig
+        Strategies to track.  Each distinct (symbol, holding_period_days)
+        pair becomes one scored key; strategies sharing a key share its
+        forecast.
+    debounce_s : float, default 1.0
+        How long the background thread waits after the first dirty mark
+        before recomputing, so that bursts of bars are batched.
+    score_fn : callable, optional
+        Batch scoring function.  Defaults to ``compute_risk_scores_batch``
+        with the given ``device``.
+    device : str, default "cpu"
+        Device for the default scoring function.
+    max_history : int, optional
+        If given, keep only the most recent ``max_history`` bars per
+        symbol.
+    publish_unchanged : bool, default False
+        Publish a delta even when the recomputed score equals the previous
+        one.
+    """
+
+    def __init__(
+        self,
+        ohlc: pd.DataFrame,
+        strategies: List[StrategyConfig],
+        debounce_s: float = 1.0,
+        score_fn: Optional[BatchScoreFn] = None,
+        device: str = "cpu",
+        max_history: Optional[int] = None,
+        publish_unchanged: bool = False,
+        ) -> None:
+        self.debounce_s = debounce_s
+        self.max_history = max_history
+        self.publish_unchanged = publish_unchanged
+        if score_fn is None:
+            def score_fn(ohlc_dict: Dict[str, pd.DataFrame], horizon: int) -> Dict[str, Tuple[int, float]]:
+                return compute_risk_scores_batch(ohlc_dict, horizon, device=device)
+        self._score_fn = score_fn
+
+        self._horizons: Dict[str, Set[int]] = {}
+        for strat in strategies:
+            if strat.symbol is None:
+                raise ValueError("Strategies must have a symbol to be tracked.")
+            self._horizons.setdefault(strat.symbol, set()).add(
+                int(strat.holding_period_days)
+            )
+
+        self._history: Dict[str, pd.DataFrame] = {}
+        for symbol, group in ohlc[ohlc["symbol"].isin(list(self._horizons))].groupby("symbol"):
+            self._history[symbol] = self._trim(group[["close"]].sort_index())
+
+        self._scores: Dict[ScoreKey, Tuple[int, float]] = {}
+        self._dirty: Set[ScoreKey] = set()
+        self._dirty_since: Optional[float] = None
+
+        self._callbacks: List[Callable[[ScoreDelta], None]] = []
+        self._queues: List["queue.Queue[ScoreDelta]"] = []
+
+        self._lock = threading.Lock()
+        # Serialises flushes, so a slow flush on older bars cannot store or
+        # publish its scores after a newer one.
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+    def subscribe(self, callback: Callable[[ScoreDelta], None]) -> None:
+        """Register a callback invoked with every published ``ScoreDelta``."""
+        self._callbacks.append(callback)
+
+    def subscribe_queue(self, maxsize: int = 0) -> "queue.Queue[ScoreDelta]":
+        """Return a new queue that receives every published ``ScoreDelta``."""
+        q: "queue.Queue[ScoreDelta]" = queue.Queue(maxsize=maxsize)
+        self._queues.append(q)
+        return q
+
+    # ------------------------------------------------------------------
+    # Input
+    # ------------------------------------------------------------------
+    def on_bars(self, symbol: str, bars: pd.DataFrame) -> int:
+        """Append new bars for a symbol and mark its horizons dirty.
+
+        Parameters
+        ----------
+        symbol : str
+            Ticker symbol.  Symbols without a tracked strategy are ignored.
+        bars : pandas.DataFrame
+            New bars indexed by datetime with a ``close`` column.  Bars
+            with a timestamp already in the history replace the old value.
+
+        Returns
+        -------
+        int
+            Number of (symbol, horizon) keys marked dirty.
+        """
+        horizons = self._horizons.get(symbol)
+        if not horizons:
+            return 0
+
+        new = bars[["close"]]
+        with self._lock:
+            history = self._history.get(symbol)
+            if history is not None:
+                merged = pd.concat([history, new])
+                merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+            else:
+                merged = new.sort_index()
+            self._history[symbol] = self._trim(merged)
+
+            for horizon in horizons:
+                self._dirty.add((symbol, horizon))
+            if self._dirty_since is None:
+                self._dirty_since = time.monotonic()
+            self._wakeup.notify()
+        return len(horizons)
+
+    def on_bar(self, symbol: str, timestamp: pd.Timestamp, close: float) -> int:
+        """Convenience wrapper around ``on_bars`` for a single bar."""
+        bar = pd.DataFrame({"close": [float(close)]},
+                           index=pd.DatetimeIndex([pd.Timestamp(timestamp)]))
+        return self.on_bars(symbol, bar)
+
+    def _trim(self, history: pd.DataFrame) -> pd.DataFrame:
+        if self.max_history is not None and len(history) > self.max_history:
+            return history.iloc[-self.max_history:]
+        return history
+
+    # ------------------------------------------------------------------
+    # Recomputation
+    # ------------------------------------------------------------------
+    def prime(self) -> List[ScoreDelta]:
+        """Mark every tracked key dirty and compute it synchronously."""
+        with self._lock:
+            for symbol, horizons in self._horizons.items():
+                if symbol in self._history:
+                    self._dirty.update((symbol, h) for h in horizons)
+        return self.flush()
+
+    def flush(self) -> List[ScoreDelta]:
+        """Recompute all dirty keys now and publish the resulting deltas.
+
+        Deltas are published horizon by horizon as each forecast finishes.
+        If the scoring function raises, the keys of the failed horizon and
+        of every horizon not attempted yet are marked dirty again (and
+        retried by the background loop after ``debounce_s``) before the
+        exception propagates.
+
+        Flushes run one at a time: a call made while the background loop
+        (or another caller) is flushing waits for it to finish, then picks
+        up whatever is still dirty.
+
+        Returns
+        -------
+        list of ScoreDelta
+            The deltas that were published.
+        """
+        with self._flush_lock:
+            return self._flush()
+
+    def _flush(self) -> List[ScoreDelta]:
+        with self._lock:
+            dirty = self._dirty
+            self._dirty = set()
+            self._dirty_since = None
+            # Snapshot the histories so that new bars can keep arriving while
+            # the (slow) forecast runs outside the lock.
+            by_horizon: Dict[int, Dict[str, pd.DataFrame]] = {}
+            for symbol, horizon in dirty:
+                history = self._history.get(symbol)
+                if history is not None and not history.empty:
+                    by_horizon.setdefault(horizon, {})[symbol] = history
+
+        deltas: List[ScoreDelta] = []
+        horizons = sorted(by_horizon)
+        for i, horizon in enumerate(horizons):
+            ohlc_dict = by_horizon[horizon]
+            try:
+                results = self._score_fn(ohlc_dict, horizon)
+            except Exception:
+                # Put this horizon and the ones not attempted yet back so the
+                # debounce loop retries them; earlier horizons are published.
+                self._mark_dirty(
+                    (symbol, h) for h in horizons[i:] for symbol in by_horizon[h]
+                )
+                raise
+
+            horizon_deltas: List[ScoreDelta] = []
+            for symbol, (score, mdd) in results.items():
+                key = (symbol, horizon)
+                with self._lock:
+                    previous = self._scores.get(key)
+                    self._scores[key] = (score, mdd)
+                if previous is not None and previous[0] == score and not self.publish_unchanged:
+                    continue
+                horizon_deltas.append(ScoreDelta(
+                    symbol=symbol,
+                    horizon=horizon,
+                    old_score=previous[0] if previous else None,
+                    new_score=score,
+                    old_mdd=previous[1] if previous else None,
+                    new_mdd=mdd,
+                    as_of=ohlc_dict[symbol].index[-1],
+                ))
+
+            # Symbols the scoring function did not return stay dirty
+            self._mark_dirty(
+                (symbol, horizon) for symbol in ohlc_dict if symbol not in results
+            )
+            # Publish as soon as the horizon is stored, so a later failure
+            # cannot leave stored scores whose deltas were never sent.
+            for delta in horizon_deltas:
+                self._publish(delta)
+            deltas.extend(horizon_deltas)
+        return deltas
+
+    def _mark_dirty(self, keys: Iterable[ScoreKey]) -> None:
+        """Re‑queue keys for the next debounced flush."""
+        with self._lock:
+            before = len(self._dirty)
+            self._dirty.update(keys)
+            if len(self._dirty) > before:
+                if self._dirty_since is None:
+                    self._dirty_since = time.monotonic()
+                self._wakeup.notify()
+
+    def _publish(self, delta: ScoreDelta) -> None:
+        for callback in self._callbacks:
+            callback(delta)
+        for q in self._queues:
+            q.put(delta)
+
+    # ------------------------------------------------------------------
+    # Background loop
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """Start the background thread that flushes on the debounce interval."""
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="incremental-rescorer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, flush: bool = True) -> None:
+        """Stop the background thread, optionally flushing pending work."""
+        with self._lock:
+            self._running = False
+            self._wakeup.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if flush and self._dirty:
+            self.flush()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while self._running and self._dirty_since is None:
+                    self._wakeup.wait()
+                if not self._running:
+                    return
+                remaining = self._dirty_since + self.debounce_s - time.monotonic()
+                if remaining > 0:
+                    self._wakeup.wait(remaining)
+                    continue
+            try:
+                self.flush()
+            except Exception:
+                # Keep the loop alive; flush() has re‑marked the failed keys
+                # dirty, so they are retried after the debounce interval.
+                traceback.print_exc()
+
+    # ------------------------------------------------------------------
+    # Inspection
+    # ------------------------------------------------------------------
+    @property
+    def scores(self) -> Dict[ScoreKey, Tuple[int, float]]:
+        """Latest ``(risk_score, mdd)`` per (symbol, horizon)."""
+        with self._lock:
+            return dict(self._scores)
+
+    @property
+    def pending(self) -> Set[ScoreKey]:
+        """Keys currently marked dirty."""
+        with self._lock:
+            return set(self._dirty)
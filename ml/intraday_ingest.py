@@ -0,0 +1,346 @@
+"""
+intraday_ingest
+---------------
+
+Stream intraday OHLC bars from a CSV file in chunks and resample them per
+symbol to the forecasting frequency (daily by default).
+
+``run_risk_with_template.load_ohlc`` reads the whole file into memory,
+which does not work for minute‑bar feeds measured in gigabytes.  Here the
+file is read ``chunksize`` rows at a time.  Each chunk is reduced to one
+partial bar per (symbol, bucket) and merged into a small running state, so
+memory is bounded by the chunk size plus the number of *output* bars,
+never by the size of the input.
+
+The resampled frame has the same layout as ``load_ohlc`` (datetime index,
+``symbol``, ``open``, ``high``, ``low``, ``close``), and
+``IntradayResampler.to_time_series`` returns it already converted by
+``prepare_time_series`` for the forecaster.
+
+Example
+-------
+>>> ohlc, stats = ingest_intraday("minute_bars.csv", freq="1D")
+>>> for s in stats:
+...     print(s)
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional
+
+import pandas as pd
+
+from chronos_risk_template import prepare_time_series
+
+
+@dataclass
+class ChunkStats:
+    """Throughput statistics for one ingested chunk.
+
+    Attributes
+    ----------
+    chunk_index : int
+        Zero‑based position of the chunk in the file.
+    rows : int
+        Number of input rows in the chunk.
+    symbols : int
+        Number of distinct symbols in the chunk.
+    bars_finalized : int
+        Total number of output bars that are complete so far.
+    bars_pending : int
+        Number of output bars still open (may receive more rows).
+    input_bytes : int
+        In‑memory size of the raw chunk.
+    seconds : float
+        Wall time spent reducing the chunk.
+    rows_per_s : float
+        Input throughput for the chunk.
+    """
+
+    chunk_index: int
+    rows: int
+    symbols: int
+    bars_finalized: int
+    bars_pending: int
+    input_bytes: int
+    seconds: float
+    rows_per_s: float
+
+
+class IntradayResampler:
+    """Incrementally resample intraday bars to a coarser fixed frequency.
+
+    Parameters
+    ----------
+    freq : str, default "1D"
+        Target bar size.  Any fixed pandas offset accepted by
+        ``Series.dt.floor`` works (e.g. ``"1D"``, ``"1h"``, ``"15min"``).
+    timestamp_col : str, default "timestamp"
+        Name of the timestamp column in the input.
+    symbol_col : str, default "symbol"
+        Name of the symbol column in the input.
+    assume_sorted : bool, default True
+        If True the input is assumed to be in time order per symbol, so
+        every bucket except the latest one of each symbol can be finalized
+        after each chunk.  Set to False for unordered files; all buckets
+        then stay in the running state until ``to_ohlc`` is called.
+    """
+
+    PRICE_COLS = ("open", "high", "low", "close")
+
+    def __init__(
+        self,
+        freq: str = "1D",
+        timestamp_col: str = "timestamp",
+        symbol_col: str = "symbol",
+        assume_sorted: bool = True,
+        ) -> None:
+        self.freq = freq
+        self.timestamp_col = timestamp_col
+        self.symbol_col = symbol_col
+        self.assume_sorted = assume_sorted
+        self._finalized: List[pd.DataFrame] = []
+        self._n_finalized = 0
+        self._pending: Optional[pd.DataFrame] = None
+        self._chunks_seen = 0
+
+    def update(self, chunk: pd.DataFrame) -> ChunkStats:
+        """Fold one chunk of raw bars into the running state.
+
+        Parameters
+        ----------
+        chunk : pandas.DataFrame
+            Raw rows with the timestamp, symbol and price columns.  A
+            ``volume`` column is summed when present.
+
+        Returns
+        -------
+        ChunkStats
+            Throughput statistics for this chunk.
+        """
+        t0 = time.perf_counter()
+        missing = [c for c in (self.timestamp_col, self.symbol_col, *self.PRICE_COLS)
+                   if c not in chunk.columns]
+        if missing:
+            raise ValueError(
+                f"Intraday chunk is missing columns {missing}. "
+                f"Available columns: {list(chunk.columns)}"
+            )
+
+        ts = pd.to_datetime(chunk[self.timestamp_col])
+        frame = pd.DataFrame({
+            "symbol": chunk[self.symbol_col].astype(str).to_numpy(),
+            "bucket": ts.dt.floor(self.freq).to_numpy(),
+            "first_ts": ts.to_numpy(),
+        })
+        for col in self.PRICE_COLS:
+            frame[col] = chunk[col].astype(float).to_numpy()
+        if "volume" in chunk.columns:
+            frame["volume"] = chunk["volume"].astype(float).to_numpy()
+        frame = frame.dropna(subset=["first_ts", "close"])
+        frame["last_ts"] = frame["first_ts"]
+
+        partial = self._merge([frame] if self._pending is None
+                              else [self._pending, frame])
+
+        if self.assume_sorted:
+            latest = partial.groupby("symbol")["bucket"].transform("max")
+            is_open = partial["bucket"] == latest
+            done = partial[~is_open]
+            if not done.empty:
+                self._finalized.append(done)
+                self._n_finalized += len(done)
+            self._pending = partial[is_open]
+        else:
+            self._pending = partial
+
+        elapsed = time.perf_counter() - t0
+        stats = ChunkStats(
+            chunk_index=self._chunks_seen,
+            rows=len(chunk),
+            symbols=int(frame["symbol"].nunique()),
+            bars_finalized=self._n_finalized,
+            bars_pending=len(self._pending),
+            input_bytes=int(chunk.memory_usage(index=False, deep=True).sum()),
+            seconds=elapsed,
+            rows_per_s=len(chunk) / elapsed if elapsed > 0 else float("inf"),
+        )
+        self._chunks_seen += 1
+        return stats
+
+    @staticmethod
+    def _merge(frames: List[pd.DataFrame]) -> pd.DataFrame:
+        """Combine partial bars that share a (symbol, bucket) key."""
+        combined = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        keys = ["symbol", "bucket"]
+        aggs = {
+            "open": "first",
+            "high": "max",
+            "low": "min",
+            "first_ts": "min",
+            "last_ts": "max",
+        }
+        if "volume" in combined.columns:
+            aggs["volume"] = "sum"
+        by_first = combined.sort_values("first_ts", kind="stable")
+        merged = by_first.groupby(keys, sort=False).agg(aggs)
+        by_last = combined.sort_values("last_ts", kind="stable")
+        merged["close"] = by_last.groupby(keys, sort=False)["close"].last()
+        return merged.reset_index()
+
+    def to_ohlc(self) -> pd.DataFrame:
+        """Return the resampled bars in the ``load_ohlc`` layout.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Data frame indexed by ``date`` (the bucket start) with columns
+            ``symbol``, ``open``, ``high``, ``low``, ``close`` (and
+            ``volume`` if the input had it), sorted by symbol and date.
+        """
+        parts = list(self._finalized)
+        if self._pending is not None:
+            parts.append(self._pending)
+        if not parts:
+            return pd.DataFrame(
+                columns=["symbol", *self.PRICE_COLS],
+                index=pd.DatetimeIndex([], name="date"),
+            )
+
+        bars = pd.concat(parts, ignore_index=True)
+        bars = bars.sort_values(["symbol", "bucket"], kind="stable")
+        cols = ["symbol", *self.PRICE_COLS]
+        if "volume" in bars.columns:
+            cols.append("volume")
+        out = bars.set_index("bucket")[cols]
+        out.index.name = "date"
+        return out
+
+    def to_time_series(
+        self,
+        id_col: str = "id",
+        timestamp_col: str = "timestamp",
+        ) -> pd.DataFrame:
+        """Return the resampled closes converted by ``prepare_time_series``."""
+        return prepare_time_series(
+            self.to_ohlc(), id_col=id_col, timestamp_col=timestamp_col
+        )
+
+
+def iter_intraday_chunks(
+    csv_path: str,
+    chunksize: int = 1_000_000,
+    timestamp_col: str = "timestamp",
+    symbol_col: str = "symbol",
+    ) -> Iterator[pd.DataFrame]:
+    """Yield raw chunks of an intraday CSV file.
+
+    Only the timestamp, symbol, OHLC and (if present) volume columns are
+    read, with prices parsed as floats.
+    """
+    wanted = {timestamp_col, symbol_col, "open", "high", "low", "close", "volume"}
+    reader = pd.read_csv(
+        csv_path,
+        chunksize=chunksize,
+        usecols=lambda c: c in wanted,
+        dtype={symbol_col: str, "open": float, "high": float,
+               "low": float, "close": float},
+    )
+    with reader:
+        for chunk in reader:
+            yield chunk
+
+
+def ingest_intraday(
+    csv_path: str,
+    freq: str = "1D",
+    chunksize: int = 1_000_000,
+    timestamp_col: str = "timestamp",
+    symbol_col: str = "symbol",
+    assume_sorted: bool = True,
+    on_chunk: Optional[Callable[[ChunkStats], None]] = None,
+    ) -> tuple[pd.DataFrame, List[ChunkStats]]:
+    """Stream an intraday CSV file and resample it per symbol.
+
+    Parameters
+    ----------
+    csv_path : str
+        Path to the intraday CSV file.
+    freq : str, default "1D"
+        Target bar size (see ``IntradayResampler``).
+    chunksize : int, default 1_000_000
+        Number of rows read per chunk.
+    timestamp_col, symbol_col : str
+        Names of the timestamp and symbol columns in the file.
+    assume_sorted : bool, default True
+        Whether rows are in time order per symbol.
+    on_chunk : callable, optional
+        Called with the ``ChunkStats`` of each chunk as soon as it is
+        processed, e.g. for progress logging.
+
+    Returns
+    -------
+    ohlc : pandas.DataFrame
+        Resampled bars in the ``load_ohlc`` layout.
+    stats : list of ChunkStats
+        Per‑chunk throughput statistics.
+    """
+    resampler = IntradayResampler(
+        freq=freq,
+        timestamp_col=timestamp_col,
+        symbol_col=symbol_col,
+        assume_sorted=assume_sorted,
+    )
+    stats: List[ChunkStats] = []
+    for chunk in iter_intraday_chunks(csv_path, chunksize, timestamp_col, symbol_col):
+        chunk_stats = resampler.update(chunk)
+        stats.append(chunk_stats)
+        if on_chunk is not None:
+            on_chunk(chunk_stats)
+    return resampler.to_ohlc(), stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Resample an intraday OHLC CSV to the forecasting frequency."
+    )
+    parser.add_argument("csv_path")
+    parser.add_argument("--freq", default="1D")
+    parser.add_argument("--chunksize", type=int, default=1_000_000)
+    parser.add_argument("--timestamp-col", default="timestamp")
+    parser.add_argument("--symbol-col", default="symbol")
+    parser.add_argument("--unsorted", action="store_true",
+                        help="Input is not in time order per symbol.")
+    parser.add_argument("--output", default=None,
+                        help="Write the resampled bars to this CSV file.")
+    args = parser.parse_args()
+
+    def _report(s: ChunkStats) -> None:
+        print(
+            f"chunk {s.chunk_index}: {s.rows} rows, {s.symbols} symbols, "
+            f"{s.input_bytes / 1e6:.1f} MB in {s.seconds:.2f}s "
+            f"({s.rows_per_s:,.0f} rows/s); bars done={s.bars_finalized}, "
+            f"pending={s.bars_pending}"
+        )
+
+    ohlc_out, all_stats = ingest_intraday(
+        args.csv_path,
+        freq=args.freq,
+        chunksize=args.chunksize,
+        timestamp_col=args.timestamp_col,
+        symbol_col=args.symbol_col,
+        assume_sorted=not args.unsorted,
+        on_chunk=_report,
+    )
+    total_rows = sum(s.rows for s in all_stats)
+    total_s = sum(s.seconds for s in all_stats)
+    print(
+        f"\n{total_rows} rows -> {len(ohlc_out)} bars for "
+        f"{ohlc_out['symbol'].nunique()} symbols in {total_s:.2f}s"
+    )
+    if args.output:
+        ohlc_out.to_csv(args.output)
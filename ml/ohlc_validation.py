@@ -0,0 +1,327 @@
+"""
+ohlc_validation
+---------------
+
+Vectorised validation and repair of a multi‑symbol OHLC frame.
+
+``prepare_time_series`` and ``load_ohlc`` only check for a datetime index
+and positive closes, and any failure raises for the whole frame, so one
+bad ticker costs the scores of the entire universe.  ``validate_ohlc``
+instead checks every symbol in one pass over the columns, applies the
+configured repairs, quarantines only the symbols that remain unusable and
+returns a compact per‑symbol data‑quality report.
+
+Checks
+------
+* non‑positive or missing prices
+* ``high < low``
+* ``close`` (and ``open``) outside ``[low, high]``
+* duplicate timestamps per symbol
+* out‑of‑order timestamps per symbol
+* missing sessions against a trading calendar (business days by default)
+* extreme close‑to‑close log returns (isolated spikes can be dropped)
+
+Example
+-------
+>>> result = validate_ohlc(load_ohlc("vn30_ohlc_synthetic.csv"))
+>>> print(result.report)
+>>> result.quarantined
+[]
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class ValidationConfig:
+    """Repair and quarantine settings for ``validate_ohlc``.
+
+    Attributes
+    ----------
+    sort_timestamps : bool
+        Reorder out‑of‑order rows by timestamp within each symbol.
+    drop_duplicates : bool
+        Keep only the last row for duplicate (symbol, timestamp) pairs.
+        With ``drop_non_positive`` the last *valid* row is kept, so a bad
+        repeat print does not cost the session.
+    fix_high_low : bool
+        Swap ``high`` and ``low`` where ``high < low``.
+    clip_to_range : bool
+        Clip ``close`` and ``open`` into ``[low, high]``.
+    drop_non_positive : bool
+        Drop rows with missing or non‑positive prices.
+    max_abs_log_return : float
+        Absolute close‑to‑close log return above which a row is flagged as
+        an extreme move.
+    drop_extreme_returns : bool
+        Drop isolated bad prints: rows whose return in and return out are
+        both extreme and of opposite sign.  The row after a spike (the
+        jump back) and one‑way level shifts are only reported.
+    calendar : pandas.DatetimeIndex, optional
+        Trading sessions used for gap detection.  Defaults to business days
+        between each symbol's first and last timestamp.
+    max_bad_row_fraction : float
+        Quarantine a symbol if more than this fraction of its rows needed
+        a repair or were dropped.
+    max_gap_fraction : float
+        Quarantine a symbol if more than this fraction of the expected
+        sessions are missing.
+    min_rows : int
+        Quarantine a symbol left with fewer rows than this after repair.
+    """
+
+    sort_timestamps: bool = True
+    drop_duplicates: bool = True
+    fix_high_low: bool = True
+    clip_to_range: bool = True
+    drop_non_positive: bool = True
+    max_abs_log_return: float = 0.25
+    drop_extreme_returns: bool = False
+    calendar: Optional[pd.DatetimeIndex] = None
+    max_bad_row_fraction: float = 0.05
+    max_gap_fraction: float = 0.2
+    min_rows: int = 20
+
+
+@dataclass
+class ValidationResult:
+    """Output of ``validate_ohlc``.
+
+    Attributes
+    ----------
+    data : pandas.DataFrame
+        Repaired rows of the symbols that passed, in the input layout
+        (datetime index, sorted by symbol and timestamp).
+    report : pandas.DataFrame
+        One row per symbol with the per‑check issue counts, the number of
+        distinct ``bad_rows`` used for quarantine, ``status`` ("ok",
+        "repaired" or "quarantined") and the quarantine ``reason``.
+    quarantined : list of str
+        Symbols excluded from ``data``.
+    """
+
+    data: pd.DataFrame
+    report: pd.DataFrame
+    quarantined: List[str]
+
+
+REPORT_COLUMNS = [
+    "rows_in",
+    "rows_out",
+    "non_positive",
+    "high_lt_low",
+    "outside_range",
+    "duplicates",
+    "out_of_order",
+    "extreme_returns",
+    "bad_rows",
+    "missing_sessions",
+    "expected_sessions",
+    "status",
+    "reason",
+]
+
+
+def validate_ohlc(
+    ohlc: pd.DataFrame,
+    config: Optional[ValidationConfig] = None,
+    symbol_col: str = "symbol",
+    price_col: str = "close",
+    ) -> ValidationResult:
+    """Validate, repair and quarantine a multi‑symbol OHLC frame.
+
+    Parameters
+    ----------
+    ohlc : pandas.DataFrame
+        Data indexed by datetime with a symbol column and at least the
+        ``price_col`` column.  ``open``, ``high`` and ``low`` are checked
+        when present.  A frame without a symbol column is treated as a
+        single series.
+    config : ValidationConfig, optional
+        Repair and quarantine settings.  Defaults to ``ValidationConfig()``.
+    symbol_col : str, default "symbol"
+        Name of the symbol column.
+    price_col : str, default "close"
+        Name of the closing price column.
+
+    Returns
+    -------
+    ValidationResult
+        Repaired data, per‑symbol report and quarantined symbols.
+
+    Raises
+    ------
+    ValueError
+        If the index is not datetime or ``price_col`` is missing.  These
+        are structural problems of the whole frame, not of one symbol.
+    """
+    if config is None:
+        config = ValidationConfig()
+    if not np.issubdtype(ohlc.index.dtype, np.datetime64):
+        raise ValueError(
+            f"Index of OHLC data must be datetime (got {ohlc.index.dtype}). "
+            "Ensure the DataFrame is indexed by datetime."
+        )
+    if price_col not in ohlc.columns:
+        raise ValueError(
+            f"Column '{price_col}' not found in OHLC data. "
+            f"Available columns: {list(ohlc.columns)}"
+        )
+
+    index_name = ohlc.index.name or "date"
+    df = ohlc.copy()
+    df.index.name = "_ts"
+    df = df.reset_index()
+    df["_row"] = np.arange(len(df))
+    if symbol_col not in df.columns:
+        df[symbol_col] = "series"
+    sym = df[symbol_col]
+
+    price_cols = [c for c in ("open", "high", "low", price_col) if c in df.columns]
+    prices = df[price_cols].apply(pd.to_numeric, errors="coerce")
+    df[price_cols] = prices
+    has_range = "high" in df.columns and "low" in df.columns
+
+    # -- Row‑level checks over the whole frame at once ---------------------
+    non_positive = (prices.isna() | (prices <= 0)).any(axis=1)
+    if has_range:
+        high_lt_low = df["high"] < df["low"]
+        lo = df[["high", "low"]].min(axis=1)
+        hi = df[["high", "low"]].max(axis=1)
+        range_cols = [c for c in ("open", price_col) if c in df.columns]
+        outside = pd.Series(False, index=df.index)
+        for col in range_cols:
+            outside |= (df[col] < lo) | (df[col] > hi)
+    else:
+        high_lt_low = pd.Series(False, index=df.index)
+        outside = pd.Series(False, index=df.index)
+    out_of_order = df.groupby(symbol_col, sort=False)["_ts"].diff() < pd.Timedelta(0)
+    # Dedupe among the rows that survive the price filter, so that a bad
+    # last copy does not take the valid one with it.
+    candidates = ~non_positive if config.drop_non_positive else pd.Series(True, index=df.index)
+    duplicates = df[candidates].duplicated([symbol_col, "_ts"], keep="last") \
+        .reindex(df.index, fill_value=False)
+
+    counts = pd.DataFrame({
+        "rows_in": 1,
+        "non_positive": non_positive,
+        "high_lt_low": high_lt_low,
+        "outside_range": outside,
+        "duplicates": duplicates,
+        "out_of_order": out_of_order,
+    }).groupby(sym, sort=True).sum().astype(int)
+
+    # -- Repairs -----------------------------------------------------------
+    keep = pd.Series(True, index=df.index)
+    if config.drop_duplicates:
+        keep &= ~duplicates
+    if config.drop_non_positive:
+        keep &= ~non_positive
+    df = df[keep].copy()
+
+    if has_range and config.fix_high_low:
+        swap = df["high"] < df["low"]
+        df.loc[swap, ["high", "low"]] = df.loc[swap, ["low", "high"]].to_numpy()
+    if has_range and config.clip_to_range:
+        for col in (c for c in ("open", price_col) if c in df.columns):
+            df[col] = df[col].clip(lower=df["low"], upper=df["high"])
+
+    order = [symbol_col, "_ts"] if config.sort_timestamps else [symbol_col, "_row"]
+    df = df.sort_values(order, kind="stable")
+
+    # Extreme moves on the repaired, ordered series
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_close = np.log(df[price_col].where(df[price_col] > 0))
+    log_ret = log_close.groupby(df[symbol_col], sort=False).diff()
+    extreme = log_ret.abs() > config.max_abs_log_return
+    counts["extreme_returns"] = extreme.groupby(df[symbol_col]).sum() \
+        .reindex(counts.index, fill_value=0).astype(int)
+    # A bad print jumps away and straight back: both its return in and its
+    # return out are extreme with opposite signs.  Only that row is dropped,
+    # not the correct row after it.
+    ret_out = log_ret.groupby(df[symbol_col], sort=False).shift(-1)
+    spike = extreme & (ret_out.abs() > config.max_abs_log_return) \
+        & (np.sign(log_ret) != np.sign(ret_out))
+    if config.drop_extreme_returns:
+        df = df[~spike]
+
+    # -- Calendar gaps -----------------------------------------------------
+    day = df["_ts"].dt.normalize()
+    bounds = day.groupby(df[symbol_col]).agg(["min", "max"])
+    if config.calendar is not None:
+        calendar = pd.DatetimeIndex(config.calendar).normalize().unique().sort_values()
+    elif not bounds.empty:
+        calendar = pd.bdate_range(bounds["min"].min(), bounds["max"].max())
+    else:
+        calendar = pd.DatetimeIndex([])
+    cal_values = calendar.to_numpy()
+    expected = (
+        np.searchsorted(cal_values, bounds["max"].to_numpy(), side="right")
+        - np.searchsorted(cal_values, bounds["min"].to_numpy(), side="left")
+    )
+    on_calendar = day.isin(calendar)
+    present = (
+        pd.DataFrame({"sym": df[symbol_col], "day": day})[on_calendar.to_numpy()]
+        .drop_duplicates()
+        .groupby("sym")
+        .size()
+        .reindex(bounds.index, fill_value=0)
+    )
+    counts["expected_sessions"] = pd.Series(expected, index=bounds.index) \
+        .reindex(counts.index, fill_value=0).astype(int)
+    counts["missing_sessions"] = (
+        counts["expected_sessions"] - present.reindex(counts.index, fill_value=0)
+    ).clip(lower=0).astype(int)
+    counts["rows_out"] = df.groupby(symbol_col).size() \
+        .reindex(counts.index, fill_value=0).astype(int)
+
+    # -- Quarantine decision -----------------------------------------------
+    # Count each bad row once, whatever number of checks it failed (a
+    # non‑positive close, for instance, is also outside [low, high]).
+    row_bad = non_positive | high_lt_low | outside | duplicates
+    if config.drop_extreme_returns:
+        row_bad |= spike.reindex(row_bad.index, fill_value=False)
+    bad_rows = row_bad.groupby(sym).sum().reindex(counts.index, fill_value=0).astype(int)
+    counts["bad_rows"] = bad_rows
+    bad_fraction = bad_rows / counts["rows_in"]
+    gap_fraction = counts["missing_sessions"] / counts["expected_sessions"].where(
+        counts["expected_sessions"] > 0, 1
+    )
+
+    reason = pd.Series("", index=counts.index)
+    reason = reason.mask(
+        counts["rows_out"] < config.min_rows,
+        "fewer than " + str(config.min_rows) + " usable rows",
+    )
+    reason = reason.mask(
+        (reason == "") & (gap_fraction > config.max_gap_fraction),
+        "missing sessions " + (gap_fraction * 100).round(1).astype(str) + "%",
+    )
+    reason = reason.mask(
+        (reason == "") & (bad_fraction > config.max_bad_row_fraction),
+        "bad rows " + (bad_fraction * 100).round(1).astype(str) + "%",
+    )
+    repaired = (bad_rows + counts["out_of_order"] + counts["extreme_returns"]) > 0
+    counts["status"] = np.where(
+        reason != "", "quarantined", np.where(repaired, "repaired", "ok")
+    )
+    counts["reason"] = reason
+
+    quarantined = [str(s) for s in counts.index[counts["status"] == "quarantined"]]
+    if quarantined:
+        df = df[~df[symbol_col].isin(quarantined)]
+
+    report = counts[REPORT_COLUMNS]
+    report.index.name = symbol_col
+
+    data = df.drop(columns=["_row"]).set_index("_ts")
+    data.index.name = index_name
+    if symbol_col not in ohlc.columns:
+        data = data.drop(columns=[symbol_col])
+    return ValidationResult(data=data, report=report, quarantined=quarantined)
@@ -0,0 +1,210 @@
+"""
+portfolio_aggregation
+---------------------
+
+Aggregate per‑symbol risk scores into portfolio scores for many users at
+once.
+
+``compute_portfolio_risk_score`` and ``run_risk_with_template.main``
+compute the weighted average
+
+    R_portfolio = Σ (position_size_pct × risk_score) / Σ position_size_pct
+
+with a Python loop per portfolio.  ``PortfolioAggregator`` stores every
+user's holdings as a sparse users × symbols weight matrix ``W`` and
+computes all portfolio scores with one sparse mat‑vec against the
+per‑symbol score vector.  When only a few symbols are rescored (for
+example from ``IncrementalRescorer`` deltas), ``update_scores`` adjusts
+just the rows of the users holding them.
+
+Requires scipy (``pip install scipy``).
+
+Example
+-------
+>>> agg = PortfolioAggregator.from_strategies({"alice": strategies})
+>>> agg.set_scores({"FPT": 43, "VHM": 3})
+>>> agg.portfolio_scores()
+>>> users = agg.update_scores({"FPT": 51})   # only holders of FPT change
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy import sparse  # type: ignore
+except ImportError as exc:
+    raise ImportError(
+        "scipy is required for portfolio_aggregation. Install with pip install scipy"
+    ) from exc
+
+from chronos_risk_template import StrategyConfig
+
+
+class PortfolioAggregator:
+    """Bulk weighted‑average risk scores for many portfolios.
+
+    Symbols without a score yet are left out of both the numerator and the
+    denominator, matching the driver script, which skips positions it
+    could not score.  A portfolio with no scored positions has score 0.0.
+
+    Parameters
+    ----------
+    holdings : iterable of (user, symbol, weight)
+        One entry per position.  Repeated (user, symbol) pairs are summed.
+    symbols : list of str, optional
+        Symbol universe (column order).  Defaults to the symbols seen in
+        ``holdings``; additional symbols can be listed so that their scores
+        are accepted even if nobody holds them yet.
+    """
+
+    def __init__(
+        self,
+        holdings: Iterable[Tuple[Hashable, str, float]],
+        symbols: Optional[List[str]] = None,
+        ) -> None:
+        rows: List[int] = []
+        cols: List[int] = []
+        weights: List[float] = []
+        self._user_index: Dict[Hashable, int] = {}
+        self._symbol_index: Dict[str, int] = {}
+        for symbol in symbols or []:
+            self._symbol_index.setdefault(symbol, len(self._symbol_index))
+
+        for user, symbol, weight in holdings:
+            rows.append(self._user_index.setdefault(user, len(self._user_index)))
+            cols.append(self._symbol_index.setdefault(symbol, len(self._symbol_index)))
+            weights.append(float(weight))
+
+        self.users: List[Hashable] = list(self._user_index)
+        self.symbols: List[str] = list(self._symbol_index)
+        shape = (len(self.users), len(self.symbols))
+        # CSR for full mat‑vecs, CSC for per‑symbol column slices on update
+        self._w = sparse.csr_matrix((weights, (rows, cols)), shape=shape, dtype=float)
+        self._w_csc = self._w.tocsc()
+
+        self._scores = np.zeros(shape[1])
+        self._scored = np.zeros(shape[1])
+        self._weighted = np.zeros(shape[0])
+        self._weight_total = np.zeros(shape[0])
+        self._portfolio = np.zeros(shape[0])
+
+    @classmethod
+    def from_strategies(
+        cls,
+        portfolios: Mapping[Hashable, Iterable[StrategyConfig]],
+        ) -> "PortfolioAggregator":
+        """Build an aggregator from ``StrategyConfig`` lists keyed by user.
+
+        Each strategy contributes its ``position_size_pct`` as the weight of
+        its ``symbol``.
+        """
+        return cls(
+            (user, strat.symbol, strat.position_size_pct)
+            for user, strategies in portfolios.items()
+            for strat in strategies
+            if strat.symbol is not None
+        )
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """``(n_users, n_symbols)`` of the weight matrix."""
+        return self._w.shape
+
+    def _columns(self, scores: Mapping[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+        cols = []
+        values = []
+        for symbol, score in scores.items():
+            col = self._symbol_index.get(symbol)
+            if col is not None:
+                cols.append(col)
+                values.append(float(score))
+        return np.asarray(cols, dtype=int), np.asarray(values, dtype=float)
+
+    def set_scores(self, scores: Mapping[str, float]) -> np.ndarray:
+        """Replace the per‑symbol scores and recompute every portfolio.
+
+        Parameters
+        ----------
+        scores : mapping of str to float
+            Score per symbol.  Symbols outside the universe are ignored;
+            symbols not listed become unscored.
+
+        Returns
+        -------
+        np.ndarray
+            Portfolio score per user, in ``self.users`` order.
+        """
+        cols, values = self._columns(scores)
+        self._scores[:] = 0.0
+        self._scored[:] = 0.0
+        self._scores[cols] = values
+        self._scored[cols] = 1.0
+
+        self._weighted = self._w @ self._scores
+        self._weight_total = self._w @ self._scored
+        self._portfolio = self._divide(self._weighted, self._weight_total)
+        return self._portfolio.copy()
+
+    def update_scores(self, scores: Mapping[str, float]) -> np.ndarray:
+        """Change the scores of a few symbols and re‑aggregate their holders.
+
+        Only the users holding at least one of the changed symbols are
+        touched; their numerators and denominators are adjusted by the
+        score deltas instead of being recomputed from scratch.
+
+        Parameters
+        ----------
+        scores : mapping of str to float
+            New score per changed symbol.
+
+        Returns
+        -------
+        np.ndarray
+            Row indices (into ``self.users``) of the affected portfolios.
+        """
+        cols, values = self._columns(scores)
+        if cols.size == 0:
+            return np.empty(0, dtype=int)
+
+        score_delta = values - self._scores[cols]
+        scored_delta = 1.0 - self._scored[cols]
+        self._scores[cols] = values
+        self._scored[cols] = 1.0
+
+        sub = self._w_csc[:, cols].tocoo()
+        np.add.at(self._weighted, sub.row, sub.data * score_delta[sub.col])
+        np.add.at(self._weight_total, sub.row, sub.data * scored_delta[sub.col])
+
+        affected = np.unique(sub.row)
+        self._portfolio[affected] = self._divide(
+            self._weighted[affected], self._weight_total[affected]
+        )
+        return affected
+
+    @staticmethod
+    def _divide(weighted: np.ndarray, total: np.ndarray) -> np.ndarray:
+        out = np.zeros_like(weighted)
+        np.divide(weighted, total, out=out, where=total > 0)
+        return out
+
+    def portfolio_scores(self, users: Optional[Iterable[Hashable]] = None) -> pd.Series:
+        """Current portfolio scores as a Series indexed by user.
+
+        Parameters
+        ----------
+        users : iterable, optional
+            Subset of users to return.  Defaults to all users.
+        """
+        if users is None:
+            return pd.Series(self._portfolio.copy(), index=self.users, name="risk_score")
+        users = list(users)
+        idx = [self._user_index[u] for u in users]
+        return pd.Series(self._portfolio[idx], index=users, name="risk_score")
+
+    def score(self, user: Hashable) -> float:
+        """Current portfolio score of one user."""
+        return float(self._portfolio[self._user_index[user]])
@@ -33,6 +33,8 @@ except ImportError as exc:
     )
     raise
 
+from ohlc_validation import validate_ohlc
+
 
 def load_ohlc(csv_path: str) -> pd.DataFrame:
     """Load OHLC data from a CSV file and set the date as the index.
@@ -46,14 +48,14 @@ def load_ohlc(csv_path: str) -> pd.DataFrame:
     Returns
     -------
     DataFrame
-        DataFrame indexed by datetime with the original columns.
+        DataFrame indexed by datetime with the original columns.  Prices
+        are not checked here; run the result through
+        ``ohlc_validation.validate_ohlc`` so that bad rows only affect
+        their own symbol.
     """
     df = pd.read_csv(csv_path)
     df["date"] = pd.to_datetime(df["date"])
     df = df.set_index("date")
-    # Validate that prices are positive
-    if (df["close"] <= 0).any():
-        raise ValueError("Close prices must be positive.")
     return df
 
 def categorize_risk_score(score: int) -> str:
@@ -115,6 +117,13 @@ def main() -> None:
         print(f"Error loading OHLC data: {e}")
         return
 
+    # Validate and repair per symbol; quarantined symbols are skipped below
+    validation = validate_ohlc(ohlc_df)
+    ohlc_df = validation.data
+    for symbol in validation.quarantined:
+        reason = validation.report.loc[symbol, "reason"]
+        print(f"Warning: Quarantined symbol '{symbol}' ({reason}).")
+
     try:
         strategies = load_strategies(strategy_json)
     except FileNotFoundError:
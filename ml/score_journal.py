@@ -0,0 +1,678 @@
+"""
+score_journal
+-------------
+
+Append‑only binary journal of computed risk scores with one Merkle root per
+write batch.
+
+Every score that drives a BLOCKED/WARN decision eventually becomes its own
+``DecisionLog.recordDecision`` transaction, while the ML side keeps no
+record of what it computed.  ``ScoreJournal`` writes each score as a
+fixed‑size binary record (timestamp, user, symbol, horizon, score, MDD,
+model/version, input hash).  Records are buffered and written with one
+``write`` + ``fsync`` per batch.  For every batch a Merkle root over the
+record hashes is appended to a sidecar ``<path>.roots`` file, so the
+backend can anchor **one hash per batch** on chain.  Any single score can
+later be proven against its anchored root with ``ScoreJournalReader.proof``.
+
+File layout
+-----------
+Both files start with a 16‑byte header (4‑byte magic, ``uint16`` format
+version, ``uint16`` record size, 8 reserved bytes) followed by
+little‑endian fixed‑size records (``RECORD_DTYPE`` and ``ROOT_DTYPE``).
+Fixed‑size records let the reader memory‑map the journal and filter it
+with vectorised numpy masks instead of parsing it.
+
+Merkle tree
+-----------
+Leaves are ``sha256(0x00 || record)``, inner nodes
+``sha256(0x01 || left || right)``.  An unpaired node is promoted to the
+next level unchanged (it is not duplicated).
+
+Example
+-------
+>>> with ScoreJournal("scores.bgj", model="amazon/chronos-2@1") as journal:
+...     journal.append("alice", "FPT", 30, score, mdd, hash_inputs(ohlc, strat))
+>>> reader = ScoreJournalReader("scores.bgj")
+>>> reader.records(symbol="FPT")
+>>> root, proof = reader.proof(0)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+import traceback
+from dataclasses import asdict, dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from chronos_risk_template import CHRONOS_MODEL_ID, StrategyConfig
+
+JOURNAL_MAGIC = b"BGSJ"
+ROOTS_MAGIC = b"BGSR"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHH8x")
+
+RECORD_DTYPE = np.dtype([
+    ("ts_ns", "<i8"),
+    ("user", "S32"),
+    ("symbol", "S16"),
+    ("horizon", "<u2"),
+    ("score", "<f4"),
+    ("mdd", "<f8"),
+    ("model", "S32"),
+    ("input_hash", "u1", (32,)),
+])
+
+ROOT_DTYPE = np.dtype([
+    ("first_record", "<u8"),
+    ("count", "<u4"),
+    ("ts_ns", "<i8"),
+    ("root", "u1", (32,)),
+])
+
+
+# ----------------------------------------------------------------------
+# Hashing helpers
+# ----------------------------------------------------------------------
+def hash_inputs(ohlc: pd.DataFrame, strategy: StrategyConfig) -> bytes:
+    """SHA‑256 digest of the inputs of one scoring call.
+
+    The digest covers the OHLC values and index (via
+    ``pandas.util.hash_pandas_object``) and the strategy parameters, so an
+    auditor holding the same inputs can reproduce it.
+    """
+    h = hashlib.sha256()
+    h.update(pd.util.hash_pandas_object(ohlc, index=True).to_numpy().tobytes())
+    h.update(json.dumps(asdict(strategy), sort_keys=True).encode("utf-8"))
+    return h.digest()
+
+
+def _leaf_hashes(records: np.ndarray) -> List[bytes]:
+    raw = records.tobytes()
+    size = RECORD_DTYPE.itemsize
+    return [
+        hashlib.sha256(b"\x00" + raw[i:i + size]).digest()
+        for i in range(0, len(raw), size)
+    ]
+
+
+def _parent(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def merkle_root(leaves: List[bytes]) -> bytes:
+    """Merkle root of a list of leaf hashes (``b""`` for no leaves)."""
+    if not leaves:
+        return b""
+    level = list(leaves)
+    while len(level) > 1:
+        nxt = [_parent(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            nxt.append(level[-1])
+        level = nxt
+    return level[0]
+
+
+def merkle_proof(leaves: List[bytes], index: int) -> List[Tuple[bytes, bool]]:
+    """Inclusion proof for ``leaves[index]``.
+
+    Returns
+    -------
+    list of (bytes, bool)
+        Sibling hashes from the leaf upwards, each with a flag telling
+        whether the sibling is on the left.
+    """
+    proof: List[Tuple[bytes, bool]] = []
+    level = list(leaves)
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append((level[sibling], sibling < index))
+        nxt = [_parent(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            nxt.append(level[-1])
+        level = nxt
+        index //= 2
+    return proof
+
+
+def verify_merkle_proof(
+    leaf: bytes,
+    proof: List[Tuple[bytes, bool]],
+    root: bytes,
+    ) -> bool:
+    """Check an inclusion proof produced by ``merkle_proof``."""
+    node = leaf
+    for sibling, sibling_is_left in proof:
+        node = _parent(sibling, node) if sibling_is_left else _parent(node, sibling)
+    return node == root
+
+
+# ----------------------------------------------------------------------
+# File helpers
+# ----------------------------------------------------------------------
+def _open_append(path: str, magic: bytes, dtype: np.dtype) -> Tuple[object, int]:
+    """Open (or create) a journal file for appending.
+
+    A trailing partial record left by a torn write is truncated.
+
+    Returns
+    -------
+    (file, int)
+        Binary file positioned at the end and the number of whole records.
+    """
+    f = open(path, "a+b")
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    if size == 0:
+        f.write(HEADER.pack(magic, FORMAT_VERSION, dtype.itemsize))
+        f.flush()
+        os.fsync(f.fileno())
+        return f, 0
+
+    f.seek(0)
+    _check_header(f.read(HEADER.size), path, magic, dtype)
+    n_records, partial = divmod(size - HEADER.size, dtype.itemsize)
+    if partial:
+        f.truncate(HEADER.size + n_records * dtype.itemsize)
+    f.seek(0, os.SEEK_END)
+    return f, n_records
+
+
+def _check_header(raw: bytes, path: str, magic: bytes, dtype: np.dtype) -> None:
+    if len(raw) < HEADER.size:
+        raise ValueError(f"{path}: truncated header.")
+    file_magic, version, record_size = HEADER.unpack(raw)
+    if file_magic != magic:
+        raise ValueError(f"{path}: bad magic {file_magic!r}, expected {magic!r}.")
+    if version != FORMAT_VERSION or record_size != dtype.itemsize:
+        raise ValueError(
+            f"{path}: unsupported format version {version} / record size "
+            f"{record_size} (expected {FORMAT_VERSION} / {dtype.itemsize})."
+        )
+
+
+def _write_durable(f, raw: bytes) -> None:
+    """Write ``raw`` at the end of ``f`` and fsync it.
+
+    Goes through the file descriptor rather than Python's buffered writer,
+    so a failed write leaves no pending bytes behind that a later flush
+    would replay.
+    """
+    fd = f.fileno()
+    view = memoryview(raw)
+    while view:
+        view = view[os.write(fd, view):]
+    os.fsync(fd)
+
+
+def _encode(value: str, width: int, field: str) -> bytes:
+    raw = value.encode("utf-8")
+    if len(raw) > width:
+        raise ValueError(f"{field} '{value}' exceeds {width} bytes.")
+    return raw
+
+
+@dataclass
+class BatchRoot:
+    """Merkle commitment for one written batch.
+
+    Attributes
+    ----------
+    batch : int
+        Zero‑based batch number.
+    first_record : int
+        Index of the first record of the batch in the journal.
+    count : int
+        Number of records in the batch.
+    ts_ns : int
+        Time the batch was committed (ns since the epoch).
+    root : bytes
+        32‑byte Merkle root to anchor on chain.
+    """
+
+    batch: int
+    first_record: int
+    count: int
+    ts_ns: int
+    root: bytes
+
+    @property
+    def root_hex(self) -> str:
+        return "0x" + self.root.hex()
+
+
+# ----------------------------------------------------------------------
+# Writer
+# ----------------------------------------------------------------------
+class ScoreJournal:
+    """Buffered append‑only writer for score records.
+
+    Parameters
+    ----------
+    path : str
+        Journal file.  Batch roots go to ``path + ".roots"``.
+    model : str, default CHRONOS_MODEL_ID
+        Default model/version tag stored with each record (≤ 32 bytes).
+    batch_size : int, default 256
+        Number of buffered records that triggers a flush.
+    flush_interval_s : float, default 1.0
+        Maximum age of the oldest buffered record.  A background thread
+        flushes a partial batch once it reaches this age, so a record is
+        on disk and anchored by a root within about this long even if no
+        further ``append`` follows.
+
+    The writer is thread‑safe: ``append``, ``flush`` and the background
+    flush share one lock.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        model: str = CHRONOS_MODEL_ID,
+        batch_size: int = 256,
+        flush_interval_s: float = 1.0,
+        ) -> None:
+        self.path = path
+        self.model = model
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+
+        self._data, self._n_records = _open_append(path, JOURNAL_MAGIC, RECORD_DTYPE)
+        self._roots, self._n_batches = _open_append(path + ".roots", ROOTS_MAGIC, ROOT_DTYPE)
+        self._buffer = np.empty(batch_size, dtype=RECORD_DTYPE)
+        self._buffered = 0
+        self._oldest: Optional[float] = None
+        # Set when a flush failed part‑way and may have left bytes past the
+        # last committed record or root.
+        self._torn = False
+
+        self._lock = threading.Lock()
+        self._due = threading.Condition(self._lock)
+        self._closed = False
+
+        self._anchor_tail()
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name="score-journal-flush", daemon=True
+        )
+        self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        """Flush partial batches once their oldest record is due."""
+        with self._due:
+            while not self._closed:
+                if self._oldest is None:
+                    self._due.wait()
+                    continue
+                remaining = self._oldest + self.flush_interval_s - time.monotonic()
+                if remaining > 0:
+                    self._due.wait(remaining)
+                    continue
+                try:
+                    self._flush_locked()
+                except Exception:
+                    # Keep the records buffered and retry after an interval
+                    traceback.print_exc()
+                    self._due.wait(self.flush_interval_s)
+
+    def _anchor_tail(self) -> None:
+        """Commit a root for records written before a crash lost their root."""
+        self._roots.seek(0, os.SEEK_END)
+        covered = 0
+        if self._n_batches:
+            self._roots.seek(HEADER.size + (self._n_batches - 1) * ROOT_DTYPE.itemsize)
+            last = np.frombuffer(self._roots.read(ROOT_DTYPE.itemsize), dtype=ROOT_DTYPE)[0]
+            covered = int(last["first_record"]) + int(last["count"])
+            self._roots.seek(0, os.SEEK_END)
+        if covered < self._n_records:
+            self._data.seek(HEADER.size + covered * RECORD_DTYPE.itemsize)
+            tail = np.frombuffer(self._data.read(), dtype=RECORD_DTYPE)
+            self._data.seek(0, os.SEEK_END)
+            self._commit_root(covered, tail)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._n_records + self._buffered
+
+    def append(
+        self,
+        user: str,
+        symbol: str,
+        horizon: int,
+        score: float,
+        mdd: float,
+        input_hash: bytes,
+        model: Optional[str] = None,
+        ts_ns: Optional[int] = None,
+        ) -> int:
+        """Buffer one score record, flushing when the batch is due.
+
+        Parameters
+        ----------
+        user, symbol : str
+            User id (≤ 32 bytes UTF‑8) and ticker (≤ 16 bytes).
+        horizon : int
+            Holding period in trading days.
+        score : float
+            Risk score (per asset or portfolio).
+        mdd : float
+            Expected maximum drawdown behind the score.
+        input_hash : bytes
+            32‑byte digest of the scoring inputs (see ``hash_inputs``).
+        model : str, optional
+            Model/version tag; defaults to the journal's ``model``.
+        ts_ns : int, optional
+            Timestamp in ns since the epoch; defaults to now.
+
+        Returns
+        -------
+        int
+            Index of the record in the journal.
+        """
+        if len(input_hash) != 32:
+            raise ValueError("input_hash must be a 32‑byte SHA‑256 digest.")
+        user_raw = _encode(str(user), 32, "user")
+        symbol_raw = _encode(symbol, 16, "symbol")
+        model_raw = _encode(model or self.model, 32, "model")
+        if ts_ns is None:
+            ts_ns = time.time_ns()
+
+        with self._lock:
+            if self._closed:
+                raise ValueError("Score journal is closed.")
+            if self._buffered >= self.batch_size:
+                # A previous flush failed; retry it (and raise its error
+                # again) rather than write past the end of the buffer.
+                self._flush_locked()
+            rec = self._buffer[self._buffered]
+            rec["ts_ns"] = ts_ns
+            rec["user"] = user_raw
+            rec["symbol"] = symbol_raw
+            rec["horizon"] = horizon
+            rec["score"] = score
+            rec["mdd"] = mdd
+            rec["model"] = model_raw
+            rec["input_hash"] = np.frombuffer(input_hash, dtype=np.uint8)
+
+            index = self._n_records + self._buffered
+            self._buffered += 1
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+                self._due.notify()
+            if self._buffered >= self.batch_size:
+                self._flush_locked()
+            return index
+
+    def flush(self) -> Optional[BatchRoot]:
+        """Write the buffered records, fsync, and commit their Merkle root.
+
+        Returns
+        -------
+        BatchRoot or None
+            The committed batch root, or ``None`` if nothing was buffered.
+        """
+        with self._lock:
+            return self._flush_locked()
+
+    def _flush_locked(self) -> Optional[BatchRoot]:
+        if self._buffered == 0:
+            return None
+        if self._torn:
+            self._truncate_to_committed()
+        batch = self._buffer[:self._buffered].copy()
+        try:
+            _write_durable(self._data, batch.tobytes())
+            committed = self._commit_root(self._n_records, batch)
+        except BaseException:
+            # Roll both files back so that the retry (which keeps the
+            # records buffered) does not write the batch a second time.
+            self._torn = True
+            try:
+                self._truncate_to_committed()
+            except OSError:
+                pass
+            raise
+
+        self._n_records += len(batch)
+        self._buffered = 0
+        self._oldest = None
+        return committed
+
+    def _truncate_to_committed(self) -> None:
+        """Cut both files back to the last committed record and root."""
+        os.ftruncate(self._data.fileno(),
+                     HEADER.size + self._n_records * RECORD_DTYPE.itemsize)
+        os.ftruncate(self._roots.fileno(),
+                     HEADER.size + self._n_batches * ROOT_DTYPE.itemsize)
+        self._torn = False
+
+    def _commit_root(self, first: int, records: np.ndarray) -> BatchRoot:
+        root = merkle_root(_leaf_hashes(records))
+        entry = np.zeros(1, dtype=ROOT_DTYPE)
+        entry["first_record"] = first
+        entry["count"] = len(records)
+        entry["ts_ns"] = time.time_ns()
+        entry["root"] = np.frombuffer(root, dtype=np.uint8)
+        _write_durable(self._roots, entry.tobytes())
+
+        committed = BatchRoot(
+            batch=self._n_batches,
+            first_record=first,
+            count=len(records),
+            ts_ns=int(entry["ts_ns"][0]),
+            root=root,
+        )
+        self._n_batches += 1
+        return committed
+
+    def close(self) -> None:
+        """Stop the background flush, flush pending records and close both files."""
+        with self._due:
+            if self._closed:
+                return
+            self._closed = True
+            self._due.notify()
+        self._flusher.join()
+        with self._lock:
+            self._flush_locked()
+            self._data.close()
+            self._roots.close()
+
+    def __enter__(self) -> "ScoreJournal":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+# ----------------------------------------------------------------------
+# Reader
+# ----------------------------------------------------------------------
+def _map_records(path: str, magic: bytes, dtype: np.dtype) -> np.ndarray:
+    with open(path, "rb") as f:
+        _check_header(f.read(HEADER.size), path, magic, dtype)
+    n = (os.path.getsize(path) - HEADER.size) // dtype.itemsize
+    if n == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=HEADER.size, shape=(n,))
+
+
+class ScoreJournalReader:
+    """Memory‑mapped, read‑only view of a journal for audits.
+
+    Only records covered by a committed batch root are exposed.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._roots = _map_records(path + ".roots", ROOTS_MAGIC, ROOT_DTYPE)
+        records = _map_records(path, JOURNAL_MAGIC, RECORD_DTYPE)
+        covered = (int(self._roots["first_record"][-1]) + int(self._roots["count"][-1])
+                   if len(self._roots) else 0)
+        self._records = records[:covered]
+        self._ts_sorted: Optional[bool] = None
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def batch_roots(self) -> List[BatchRoot]:
+        """All committed batch roots, in order."""
+        return [
+            BatchRoot(
+                batch=i,
+                first_record=int(r["first_record"]),
+                count=int(r["count"]),
+                ts_ns=int(r["ts_ns"]),
+                root=r["root"].tobytes(),
+            )
+            for i, r in enumerate(self._roots)
+        ]
+
+    def records(
+        self,
+        user: Optional[str] = None,
+        symbol: Optional[str] = None,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+        ) -> pd.DataFrame:
+        """Filter records with vectorised masks over the mapped file.
+
+        Parameters
+        ----------
+        user, symbol : str, optional
+            Exact matches.
+        start, end : pandas.Timestamp, optional
+            Inclusive start / exclusive end on the record timestamp
+            (timezone‑naive values are taken as UTC).
+
+        Returns
+        -------
+        pandas.DataFrame
+            Matching records indexed by record number, with decoded
+            strings, a ``timestamp`` column and ``input_hash`` as hex.
+        """
+        recs = self._records
+        lo, hi = 0, len(recs)
+        if (start is not None or end is not None) and self._timestamps_sorted():
+            ts = recs["ts_ns"]
+            if start is not None:
+                lo = int(np.searchsorted(ts, _to_ns(start), side="left"))
+            if end is not None:
+                hi = int(np.searchsorted(ts, _to_ns(end), side="left"))
+            start = end = None
+        view = recs[lo:hi]
+
+        mask = np.ones(len(view), dtype=bool)
+        if user is not None:
+            mask &= view["user"] == user.encode("utf-8")
+        if symbol is not None:
+            mask &= view["symbol"] == symbol.encode("utf-8")
+        if start is not None:
+            mask &= view["ts_ns"] >= _to_ns(start)
+        if end is not None:
+            mask &= view["ts_ns"] < _to_ns(end)
+
+        idx = np.flatnonzero(mask)
+        sel = np.asarray(view[idx])
+        return pd.DataFrame({
+            "timestamp": pd.to_datetime(sel["ts_ns"], unit="ns", utc=True),
+            "user": np.char.decode(sel["user"], "utf-8"),
+            "symbol": np.char.decode(sel["symbol"], "utf-8"),
+            "horizon": sel["horizon"].astype(int),
+            "score": sel["score"].astype(float),
+            "mdd": sel["mdd"],
+            "model": np.char.decode(sel["model"], "utf-8"),
+            "input_hash": [row.tobytes().hex() for row in sel["input_hash"]],
+        }, index=pd.Index(idx + lo, name="record"))
+
+    def _timestamps_sorted(self) -> bool:
+        if self._ts_sorted is None:
+            ts = self._records["ts_ns"]
+            self._ts_sorted = bool(len(ts) < 2 or np.all(ts[1:] >= ts[:-1]))
+        return self._ts_sorted
+
+    def batch_of(self, record: int) -> int:
+        """Batch number containing a record index."""
+        if not 0 <= record < len(self._records):
+            raise IndexError(f"Record {record} is not in a committed batch.")
+        return int(np.searchsorted(self._roots["first_record"], record, side="right") - 1)
+
+    def _batch_leaves(self, batch: int) -> List[bytes]:
+        first = int(self._roots["first_record"][batch])
+        count = int(self._roots["count"][batch])
+        return _leaf_hashes(np.asarray(self._records[first:first + count]))
+
+    def proof(self, record: int) -> Tuple[bytes, List[Tuple[bytes, bool]]]:
+        """Merkle inclusion proof of one record against its batch root.
+
+        Returns
+        -------
+        (bytes, list of (bytes, bool))
+            The committed batch root and the proof path (see
+            ``merkle_proof``).  The leaf is ``sha256(0x00 || record)``.
+        """
+        batch = self.batch_of(record)
+        leaves = self._batch_leaves(batch)
+        position = record - int(self._roots["first_record"][batch])
+        return self._roots["root"][batch].tobytes(), merkle_proof(leaves, position)
+
+    def leaf(self, record: int) -> bytes:
+        """Leaf hash of one record."""
+        return _leaf_hashes(np.asarray(self._records[record:record + 1]))[0]
+
+    def verify(self) -> List[int]:
+        """Recompute every batch root.
+
+        Returns
+        -------
+        list of int
+            Batch numbers whose stored root does not match the records.
+        """
+        bad = []
+        for batch in range(len(self._roots)):
+            if merkle_root(self._batch_leaves(batch)) != self._roots["root"][batch].tobytes():
+                bad.append(batch)
+        return bad
+
+
+def _to_ns(ts: pd.Timestamp) -> int:
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("UTC")
+    return int(ts.value)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect a score journal.")
+    parser.add_argument("path")
+    parser.add_argument("--verify", action="store_true",
+                        help="Recompute all batch roots.")
+    parser.add_argument("--roots", action="store_true",
+                        help="List batch roots.")
+    parser.add_argument("--user", default=None)
+    parser.add_argument("--symbol", default=None)
+    args = parser.parse_args()
+
+    reader = ScoreJournalReader(args.path)
+    print(f"{len(reader)} records in {len(reader.batch_roots)} batches")
+    if args.roots:
+        for b in reader.batch_roots:
+            print(f"batch {b.batch}: records {b.first_record}..{b.first_record + b.count - 1} "
+                  f"root {b.root_hex}")
+    if args.verify:
+        bad_batches = reader.verify()
+        print("all batch roots verified" if not bad_batches
+              else f"root mismatch in batches {bad_batches}")
+    if args.user or args.symbol:
+        print(reader.records(user=args.user, symbol=args.symbol).to_string())
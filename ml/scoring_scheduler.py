@@ -0,0 +1,480 @@
+"""
+scoring_scheduler
+-----------------
+
+Priority classes, bounded queues and load shedding for the ML scoring path.
+
+The backend treats every ML call the same and only has a 10 s timeout, but
+a blocking decision on a sell order during a crash is far more latency
+critical than a nightly re‑score or a UI what‑if.  ``ScoringScheduler``
+runs scoring calls on a small pool of worker threads with one bounded
+queue per ``Priority`` class:
+
+* **Admission control** – a full queue rejects new work with
+  ``Overloaded``.  For classes with a delay budget, a request whose
+  estimated queue delay (queued requests plus the remaining time of the
+  forecasts already running) exceeds the budget is answered right away
+  with the cheap path instead of being queued.
+* **Strict priority** – workers always take the oldest request of the
+  most urgent non‑empty class, and ``reserved_workers`` threads serve
+  ``ORDER_INTENT`` only, so an order never waits behind a long batch
+  forecast.
+* **Shedding / degradation** – as soon as a queued request has waited
+  longer than its class's ``shed_after_s``, a timer thread either degrades
+  it to the cheap path (``historical_risk_score`` by default) or drops it
+  with ``Shed``; it does not wait for a worker to free up.
+* **Per‑class latency histograms** for queue delay and end‑to‑end time.
+
+``start`` loads the Chronos pipeline up front, so the first order‑intent
+request does not pay for ``from_pretrained``.
+
+Example
+-------
+>>> scheduler = ScoringScheduler(n_workers=3)
+>>> scheduler.start()
+>>> fut = scheduler.submit(Priority.ORDER_INTENT, asset_close, strategy)
+>>> score, mdd = fut.result(timeout=5)
+>>> scheduler.stats()["order_intent"]["total_ms"]["p99"]
+>>> scheduler.stop()
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from chronos_risk_template import (
+    compute_risk_score,
+    historical_risk_score,
+    load_pipeline,
+)
+
+
+class Priority(IntEnum):
+    """Scoring request classes, most urgent first."""
+
+    ORDER_INTENT = 0
+    INTERACTIVE = 1
+    BATCH = 2
+
+
+class Overloaded(RuntimeError):
+    """Raised by ``submit`` when a class's queue is full."""
+
+
+class Shed(RuntimeError):
+    """Set on a request's future when it was dropped after waiting too long."""
+
+
+@dataclass
+class ClassPolicy:
+    """Queueing policy of one priority class.
+
+    Attributes
+    ----------
+    max_queue : int
+        Maximum number of queued (not yet running) requests.
+    shed_after_s : float or None
+        Queue‑delay budget.  ``None`` means the class is never shed.
+    degrade : bool
+        When over budget, answer with the cheap path (True) or drop the
+        request with ``Shed`` (False).
+    """
+
+    max_queue: int
+    shed_after_s: Optional[float] = None
+    degrade: bool = True
+
+
+DEFAULT_POLICIES: Dict[Priority, ClassPolicy] = {
+    Priority.ORDER_INTENT: ClassPolicy(max_queue=64, shed_after_s=None),
+    Priority.INTERACTIVE: ClassPolicy(max_queue=256, shed_after_s=0.5, degrade=True),
+    Priority.BATCH: ClassPolicy(max_queue=10_000, shed_after_s=30.0, degrade=False),
+}
+
+
+class LatencyHistogram:
+    """Fixed‑bucket latency histogram in milliseconds."""
+
+    BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1_000, 2_000, 5_000, 10_000)
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.total = 0
+        self.max_ms = 0.0
+
+    def record(self, seconds: float) -> None:
+        ms = seconds * 1000.0
+        self.counts[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+        self.total += 1
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the ``p``‑th percentile (ms).
+
+        Samples beyond the last bound report the observed maximum.
+        """
+        if self.total == 0:
+            return 0.0
+        rank = p / 100.0 * self.total
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank and count:
+                return float(self.BOUNDS_MS[i]) if i < len(self.BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.total,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max_ms,
+            "buckets_ms": dict(zip([*map(str, self.BOUNDS_MS), "inf"], self.counts)),
+        }
+
+
+@dataclass
+class _ClassState:
+    policy: ClassPolicy
+    queue: Deque["_Request"] = field(default_factory=deque)
+    admitted: int = 0
+    rejected: int = 0
+    shed: int = 0
+    degraded: int = 0
+    completed: int = 0
+    failed: int = 0
+    queue_delay: LatencyHistogram = field(default_factory=LatencyHistogram)
+    total: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+
+@dataclass
+class _Request:
+    priority: Priority
+    args: Tuple[Any, ...]
+    kwargs: Dict[str, Any]
+    future: Future
+    submitted: float
+    deadline: Optional[float] = None
+
+
+class ScoringScheduler:
+    """Run scoring calls by priority with admission control and shedding.
+
+    Parameters
+    ----------
+    score_fn : callable, default compute_risk_score
+        Full scoring path.
+    cheap_fn : callable, default historical_risk_score
+        Degraded path.  It is called with the same arguments as
+        ``score_fn`` and must accept them.
+    n_workers : int, default 2
+        Number of worker threads.  Forecasting releases the GIL inside
+        PyTorch, so threads overlap well.
+    reserved_workers : int, default 1
+        Workers that serve ``ORDER_INTENT`` only.  Must be smaller than
+        ``n_workers``.
+    policies : dict[Priority, ClassPolicy], optional
+        Per‑class policies; missing classes use ``DEFAULT_POLICIES``.
+    preload_device : str or None, default "cpu"
+        When ``score_fn`` is ``compute_risk_score``, ``start`` loads the
+        pipeline for this device before the workers start.  ``None`` skips
+        the preload.
+    """
+
+    def __init__(
+        self,
+        score_fn: Callable[..., Any] = compute_risk_score,
+        cheap_fn: Optional[Callable[..., Any]] = historical_risk_score,
+        n_workers: int = 2,
+        reserved_workers: int = 1,
+        policies: Optional[Dict[Priority, ClassPolicy]] = None,
+        preload_device: Optional[str] = "cpu",
+        ) -> None:
+        if not 0 <= reserved_workers < n_workers:
+            raise ValueError("reserved_workers must be in [0, n_workers).")
+        self.score_fn = score_fn
+        self.cheap_fn = cheap_fn
+        self.n_workers = n_workers
+        self.reserved_workers = reserved_workers
+        self.preload_device = preload_device
+
+        merged = dict(DEFAULT_POLICIES)
+        merged.update(policies or {})
+        self._classes: Dict[Priority, _ClassState] = {
+            p: _ClassState(policy=merged[p]) for p in Priority
+        }
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._threads: List[threading.Thread] = []
+        self._running = False
+        # Full‑path requests being scored: id -> (on a reserved worker, start)
+        self._inflight: Dict[int, Tuple[bool, float]] = {}
+        # Exponentially weighted service time of the full path, for the
+        # admission‑time delay estimate.
+        self._service_s = 0.0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> "ScoringScheduler":
+        """Load the model, then start the worker and shedding threads."""
+        with self._lock:
+            if self._running:
+                return self
+        if self.score_fn is compute_risk_score and self.preload_device is not None:
+            load_pipeline(device=self.preload_device)
+        with self._lock:
+            if self._running:
+                return self
+            self._running = True
+        expiry = threading.Thread(target=self._expire_loop, name="scoring-expiry", daemon=True)
+        expiry.start()
+        self._threads.append(expiry)
+        for i in range(self.n_workers):
+            only_orders = i < self.reserved_workers
+            t = threading.Thread(
+                target=self._worker,
+                args=(only_orders,),
+                name=f"scoring-{'order' if only_orders else 'shared'}-{i}",
+                daemon=True,
+            )
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the workers; queued requests are cancelled."""
+        with self._lock:
+            self._running = False
+            pending = [r for s in self._classes.values() for r in s.queue]
+            for state in self._classes.values():
+                state.queue.clear()
+            self._ready.notify_all()
+        for request in pending:
+            request.future.cancel()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def __enter__(self) -> "ScoringScheduler":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+    def submit(self, priority: Priority, *args: Any, **kwargs: Any) -> Future:
+        """Queue one scoring call.
+
+        Parameters
+        ----------
+        priority : Priority
+            Request class.
+        *args, **kwargs
+            Arguments for ``score_fn`` (and ``cheap_fn`` if degraded).
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Resolves to the scoring result, or raises ``Shed``.
+
+        Raises
+        ------
+        Overloaded
+            If the class's queue is full.
+        """
+        priority = Priority(priority)
+        now = time.monotonic()
+        request = _Request(priority, args, kwargs, Future(), now)
+
+        with self._lock:
+            if not self._running:
+                raise RuntimeError("ScoringScheduler is not running; call start().")
+            state = self._classes[priority]
+            policy = state.policy
+            if policy.shed_after_s is not None:
+                request.deadline = now + policy.shed_after_s
+            if len(state.queue) >= policy.max_queue:
+                state.rejected += 1
+                raise Overloaded(
+                    f"{priority.name} queue is full ({policy.max_queue} requests)."
+                )
+            degrade_now = (
+                policy.shed_after_s is not None
+                and policy.degrade
+                and self.cheap_fn is not None
+                and self._estimated_delay(priority, now) > policy.shed_after_s
+            )
+            state.admitted += 1
+            if not degrade_now:
+                state.queue.append(request)
+                self._ready.notify_all()
+
+        if degrade_now:
+            request.future.set_running_or_notify_cancel()
+            self._run(request, degraded=True, started=now)
+        return request.future
+
+    def _estimated_delay(self, priority: Priority, now: float) -> float:
+        """Expected queue delay for a new request of ``priority`` (lock held).
+
+        Counts the requests queued ahead of it and the expected remaining
+        time of the forecasts already running on the workers that could
+        serve it.
+        """
+        ahead = sum(len(self._classes[p].queue) for p in Priority if p <= priority)
+        if priority == Priority.ORDER_INTENT:
+            workers = self.n_workers
+            busy = list(self._inflight.values())
+        else:
+            workers = self.n_workers - self.reserved_workers
+            busy = [v for v in self._inflight.values() if not v[0]]
+        if ahead < workers - len(busy):
+            return 0.0  # an eligible worker is idle
+        remaining = sum(max(self._service_s - (now - started), 0.0) for _, started in busy)
+        return (remaining + ahead * self._service_s) / max(1, workers)
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+    def _next_request(self, only_orders: bool) -> Optional[_Request]:
+        """Pop the oldest request of the most urgent eligible class (lock held)."""
+        classes = (Priority.ORDER_INTENT,) if only_orders else tuple(Priority)
+        for p in classes:
+            queue = self._classes[p].queue
+            if queue:
+                return queue.popleft()
+        return None
+
+    def _worker(self, only_orders: bool) -> None:
+        while True:
+            with self._lock:
+                request = self._next_request(only_orders)
+                while request is None and self._running:
+                    self._ready.wait()
+                    request = self._next_request(only_orders)
+                if request is None:
+                    return
+                started = time.monotonic()
+                expired = request.deadline is not None and started > request.deadline
+                if not expired:
+                    self._inflight[id(request)] = (only_orders, started)
+
+            if expired:
+                # The expiry thread had not reached it yet
+                self._expire(request, started)
+                continue
+            if not request.future.set_running_or_notify_cancel():
+                with self._lock:
+                    self._inflight.pop(id(request), None)
+                continue  # cancelled by the caller while queued
+            self._run(request, degraded=False, started=started)
+
+    def _expire_loop(self) -> None:
+        """Degrade or shed queued requests as soon as their budget runs out."""
+        while True:
+            with self._lock:
+                if not self._running:
+                    return
+                now = time.monotonic()
+                expired: List[_Request] = []
+                next_deadline: Optional[float] = None
+                for state in self._classes.values():
+                    # Deadlines within a class grow with submission order
+                    queue = state.queue
+                    while queue and queue[0].deadline is not None and queue[0].deadline <= now:
+                        expired.append(queue.popleft())
+                    if queue and queue[0].deadline is not None:
+                        if next_deadline is None or queue[0].deadline < next_deadline:
+                            next_deadline = queue[0].deadline
+                if not expired:
+                    self._ready.wait(None if next_deadline is None else next_deadline - now)
+                    continue
+            for request in expired:
+                self._expire(request, now)
+
+    def _expire(self, request: _Request, now: float) -> None:
+        """Answer an over‑budget request with the cheap path or ``Shed``."""
+        if not request.future.set_running_or_notify_cancel():
+            return  # cancelled by the caller while queued
+        state = self._classes[request.priority]
+        if state.policy.degrade and self.cheap_fn is not None:
+            self._run(request, degraded=True, started=now)
+            return
+        with self._lock:
+            state.shed += 1
+            state.queue_delay.record(now - request.submitted)
+        request.future.set_exception(Shed(
+            f"{request.priority.name} request shed after "
+            f"{now - request.submitted:.3f}s in queue."
+        ))
+
+    def _run(self, request: _Request, degraded: bool, started: float) -> None:
+        fn = self.cheap_fn if degraded else self.score_fn
+        try:
+            result = fn(*request.args, **request.kwargs)
+            error: Optional[BaseException] = None
+        except Exception as exc:
+            result, error = None, exc
+        finished = time.monotonic()
+
+        state = self._classes[request.priority]
+        with self._lock:
+            state.queue_delay.record(started - request.submitted)
+            state.total.record(finished - request.submitted)
+            if degraded:
+                state.degraded += 1
+            else:
+                self._inflight.pop(id(request), None)
+                elapsed = finished - started
+                self._service_s = (elapsed if self._service_s == 0.0
+                                   else 0.8 * self._service_s + 0.2 * elapsed)
+            if error is None:
+                state.completed += 1
+            else:
+                state.failed += 1
+
+        if error is None:
+            request.future.set_result(result)
+        else:
+            request.future.set_exception(error)
+
+    # ------------------------------------------------------------------
+    # Inspection
+    # ------------------------------------------------------------------
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per‑class counters and latency histograms.
+
+        Returns
+        -------
+        dict
+            Keyed by lower‑case class name; each entry has ``queued``,
+            ``admitted``, ``rejected``, ``shed``, ``degraded``,
+            ``completed``, ``failed`` and the ``queue_delay_ms`` /
+            ``total_ms`` histogram snapshots.
+        """
+        with self._lock:
+            return {
+                p.name.lower(): {
+                    "queued": len(s.queue),
+                    "admitted": s.admitted,
+                    "rejected": s.rejected,
+                    "shed": s.shed,
+                    "degraded": s.degraded,
+                    "completed": s.completed,
+                    "failed": s.failed,
+                    "queue_delay_ms": s.queue_delay.snapshot(),
+                    "total_ms": s.total.snapshot(),
+                }
+                for p, s in self._classes.items()
+            }
@@ -0,0 +1,506 @@
+"""
+shared_model_workers
+--------------------
+
+Run several risk‑scoring worker processes that share one copy of the
+Chronos‑2 weights.
+
+Each call to ``Chronos2Pipeline.from_pretrained`` allocates its own copy of
+the model, so starting one scoring process per core multiplies the resident
+memory by the number of workers.  This module loads the pipeline **once**
+in the parent process (through ``chronos_risk_template.load_pipeline``)
+and then forks the workers.  The children inherit the parent's pages
+copy‑on‑write: the weights are never written after loading, so they stay
+shared and a new worker starts without touching the checkpoint again.
+
+Memory accounting is read from ``/proc/<pid>/smaps_rollup`` and split into
+*unique* (private) and *shared* pages per worker.  This is Linux specific;
+on other platforms the report is empty.
+
+Example
+-------
+>>> pool = SharedModelPool(n_workers=4)
+>>> pool.start()
+>>> results = pool.map([(asset_close, strategy) for ...])
+>>> for row in pool.memory_report():
+...     print(row)
+>>> pool.close()
+"""
+
+from __future__ import annotations
+
+import gc
+import multiprocessing as mp
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from multiprocessing.connection import wait
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from chronos_risk_template import (
+    CHRONOS_MODEL_ID,
+    StrategyConfig,
+    compute_risk_score,
+    load_pipeline,
+)
+
+
+@dataclass
+class WorkerMemory:
+    """Memory usage of one process, in kilobytes.
+
+    Attributes
+    ----------
+    pid : int
+        Process id.
+    rss_kb : int
+        Resident set size.
+    pss_kb : int
+        Proportional set size (shared pages divided among their users).
+    unique_kb : int
+        Private pages (``Private_Clean + Private_Dirty``), i.e. the memory
+        that would be freed if the process exited.
+    shared_kb : int
+        Pages shared with at least one other process
+        (``Shared_Clean + Shared_Dirty``).
+    startup_s : float
+        Time from fork until the worker reported ready (0.0 for the parent).
+    """
+
+    pid: int
+    rss_kb: int
+    pss_kb: int
+    unique_kb: int
+    shared_kb: int
+    startup_s: float = 0.0
+
+
+def read_process_memory(pid: int) -> Optional[Dict[str, int]]:
+    """Read the ``smaps_rollup`` counters for a process.
+
+    Parameters
+    ----------
+    pid : int
+        Process id to inspect.
+
+    Returns
+    -------
+    dict[str, int] or None
+        Mapping of counter name (e.g. ``"Rss"``, ``"Private_Dirty"``) to
+        kilobytes, or ``None`` if the file is unavailable.
+    """
+    path = f"/proc/{pid}/smaps_rollup"
+    try:
+        with open(path, "r", encoding="ascii") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    counters: Dict[str, int] = {}
+    for line in lines:
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+            counters[parts[0][:-1]] = int(parts[1])
+    return counters
+
+
+def _worker_loop(
+    conn: Any,
+    model_id: str,
+    device: str,
+    torch_threads: Optional[int],
+    forked_at: float,
+    ) -> None:
+    """Main loop of a forked scoring worker."""
+    if torch_threads is not None:
+        try:
+            import torch  # type: ignore
+            torch.set_num_threads(torch_threads)
+        except ImportError:
+            pass
+
+    # Cache hit: the pipeline was loaded by the parent before forking
+    pipeline = load_pipeline(model_id, device)
+    conn.send(("ready", os.getpid(), time.time() - forked_at))
+
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        job_id, ohlc, strategy = task
+        try:
+            score, mdd = compute_risk_score(
+                ohlc, strategy, device=device, pipeline=pipeline
+            )
+            conn.send(("ok", job_id, (score, mdd)))
+        except Exception as exc:
+            conn.send(("error", job_id, f"{type(exc).__name__}: {exc}"))
+
+
+@dataclass
+class _WorkerHandle:
+    """Parent‑side handle of one worker: its process and private pipe."""
+
+    proc: Any
+    conn: Any
+    job: Optional[int] = None
+    job_started: float = 0.0
+
+
+class SharedModelPool:
+    """Pool of forked scoring workers sharing one set of model weights.
+
+    Each worker has its own pipe and the parent hands out one job at a
+    time, so it always knows which job a worker holds.  The parent waits on
+    the pipes and the process sentinels together: if a worker dies (e.g.
+    OOM‑killed) its job is resubmitted up to ``max_retries`` times, then
+    reported as failed, and a replacement worker is forked.  Nothing blocks
+    forever on a dead worker.
+
+    Parameters
+    ----------
+    n_workers : int, optional
+        Number of worker processes.  Defaults to ``os.cpu_count()``.
+    model_id : str, default CHRONOS_MODEL_ID
+        Model identifier passed to ``load_pipeline``.
+    device : str, default "cpu"
+        Device for inference.
+    torch_threads : int or None, default 1
+        Intra‑op thread count set in each worker, so that N workers do not
+        each spawn one thread per core.  ``None`` leaves the default.
+    startup_timeout : float, default 60.0
+        Seconds to wait for a new worker to report ready.
+    job_timeout : float or None, default None
+        Seconds after which a running job is abandoned and its worker
+        killed and replaced.  ``None`` waits as long as the worker lives.
+    max_retries : int, default 1
+        How often a job whose worker died is resubmitted before failing.
+    """
+
+    def __init__(
+        self,
+        n_workers: Optional[int] = None,
+        model_id: str = CHRONOS_MODEL_ID,
+        device: str = "cpu",
+        torch_threads: Optional[int] = 1,
+        startup_timeout: float = 60.0,
+        job_timeout: Optional[float] = None,
+        max_retries: int = 1,
+        ) -> None:
+        if "fork" not in mp.get_all_start_methods():
+            raise RuntimeError(
+                "SharedModelPool requires the 'fork' start method, which is "
+                "not available on this platform."
+            )
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.model_id = model_id
+        self.device = device
+        self.torch_threads = torch_threads
+        self.startup_timeout = startup_timeout
+        self.job_timeout = job_timeout
+        self.max_retries = max_retries
+        self._ctx = mp.get_context("fork")
+        self._started = False
+        self._workers: List[_WorkerHandle] = []
+        self._startup: Dict[int, float] = {}
+
+    def start(self) -> "SharedModelPool":
+        """Load the weights in this process, then fork the workers."""
+        if self._started:
+            return self
+
+        load_pipeline(self.model_id, self.device)
+        # Move every object allocated so far into the permanent generation so
+        # that the garbage collector does not write to their headers in the
+        # children and un‑share the pages.
+        gc.collect()
+        gc.freeze()
+
+        self._started = True
+        for _ in range(self.n_workers):
+            self.add_worker()
+        return self
+
+    def add_worker(self) -> int:
+        """Fork one additional worker and wait until it is ready.
+
+        Returns
+        -------
+        int
+            Process id of the new worker.
+
+        Raises
+        ------
+        RuntimeError
+            If the worker dies or does not report ready within
+            ``startup_timeout`` seconds.
+        """
+        if not self._started:
+            raise RuntimeError("Call start() before adding workers.")
+        parent_conn, child_conn = self._ctx.Pipe()
+        proc = self._ctx.Process(
+            target=_worker_loop,
+            args=(
+                child_conn,
+                self.model_id,
+                self.device,
+                self.torch_threads,
+                time.time(),
+            ),
+            daemon=True,
+        )
+        proc.start()
+        child_conn.close()
+
+        ready = wait([parent_conn, proc.sentinel], timeout=self.startup_timeout)
+        message = None
+        if parent_conn in ready:
+            try:
+                message = parent_conn.recv()
+            except EOFError:
+                message = None
+        if message is None or message[0] != "ready":
+            if proc.is_alive():
+                proc.terminate()
+            proc.join(1.0)
+            parent_conn.close()
+            if message is not None:
+                raise RuntimeError(f"Unexpected message from worker: {message[0]}")
+            if not ready:
+                raise RuntimeError(
+                    f"Worker did not start within {self.startup_timeout:.0f}s."
+                )
+            raise RuntimeError(
+                f"Worker died during startup (exit code {proc.exitcode})."
+            )
+
+        _, pid, elapsed = message
+        self._startup[pid] = elapsed
+        self._workers.append(_WorkerHandle(proc=proc, conn=parent_conn))
+        return pid
+
+    def _retire(self, worker: _WorkerHandle) -> None:
+        """Kill and forget a worker that died or overran its job."""
+        if worker.proc.is_alive():
+            worker.proc.terminate()
+        worker.proc.join(1.0)
+        worker.conn.close()
+        self._workers.remove(worker)
+        self._startup.pop(worker.proc.pid, None)
+
+    def map(
+        self,
+        jobs: Sequence[Tuple[pd.DataFrame, StrategyConfig]],
+        ) -> List[Tuple[int, float]]:
+        """Score a batch of (ohlc, strategy) jobs across the workers.
+
+        Parameters
+        ----------
+        jobs : sequence of (pandas.DataFrame, StrategyConfig)
+            Inputs accepted by ``compute_risk_score``.
+
+        Returns
+        -------
+        list of (int, float)
+            ``(risk_score, mdd)`` per job, in input order.
+
+        Raises
+        ------
+        RuntimeError
+            If any job failed in a worker, was lost with its worker more
+            than ``max_retries`` times, or exceeded ``job_timeout``.
+        """
+        if not self._started:
+            self.start()
+
+        pending = deque(range(len(jobs)))
+        attempts = [0] * len(jobs)
+        outcomes: Dict[int, Tuple[int, float]] = {}
+        errors: Dict[int, str] = {}
+
+        def lost(job_id: int, why: str) -> None:
+            attempts[job_id] += 1
+            if attempts[job_id] > self.max_retries:
+                errors[job_id] = why
+            else:
+                pending.appendleft(job_id)
+
+        while len(outcomes) + len(errors) < len(jobs):
+            # Drop idle workers that died since the last round and keep the
+            # pool at full size
+            for worker in [w for w in self._workers
+                           if w.job is None and not w.proc.is_alive()]:
+                self._retire(worker)
+            while len(self._workers) < self.n_workers:
+                self.add_worker()
+
+            for worker in list(self._workers):
+                if worker.job is None and pending:
+                    job_id = pending.popleft()
+                    ohlc, strategy = jobs[job_id]
+                    worker.job = job_id
+                    worker.job_started = time.monotonic()
+                    try:
+                        worker.conn.send((job_id, ohlc, strategy))
+                    except (BrokenPipeError, OSError):
+                        self._retire(worker)
+                        lost(job_id, f"worker {worker.proc.pid} died "
+                                     f"(exit code {worker.proc.exitcode})")
+
+            busy = [w for w in self._workers if w.job is not None]
+            if not busy:
+                continue
+            timeout = None
+            if self.job_timeout is not None:
+                now = time.monotonic()
+                timeout = max(0.0, min(
+                    w.job_started + self.job_timeout - now for w in busy
+                ))
+            handles = [w.conn for w in busy] + [w.proc.sentinel for w in busy]
+            ready = set(wait(handles, timeout=timeout))
+
+            for worker in busy:
+                job_id = worker.job
+                message = None
+                if worker.conn in ready:
+                    try:
+                        message = worker.conn.recv()
+                    except (EOFError, OSError):
+                        message = None
+                if message is not None:
+                    kind, _, payload = message
+                    worker.job = None
+                    if kind == "ok":
+                        outcomes[job_id] = payload
+                    else:
+                        errors[job_id] = payload
+                elif worker.proc.sentinel in ready or not worker.proc.is_alive():
+                    self._retire(worker)
+                    lost(job_id, f"worker {worker.proc.pid} died "
+                                 f"(exit code {worker.proc.exitcode})")
+                elif (self.job_timeout is not None
+                      and time.monotonic() - worker.job_started >= self.job_timeout):
+                    self._retire(worker)
+                    lost(job_id, f"timed out after {self.job_timeout:.0f}s")
+
+        if errors:
+            raise RuntimeError("Scoring failed for " + "; ".join(
+                f"job {job_id}: {why}" for job_id, why in sorted(errors.items())
+            ))
+        return [outcomes[i] for i in range(len(jobs))]
+
+    def score(
+        self,
+        ohlc: pd.DataFrame,
+        strategy: StrategyConfig,
+        ) -> Tuple[int, float]:
+        """Score a single job on the pool."""
+        return self.map([(ohlc, strategy)])[0]
+
+    def memory_report(self, include_parent: bool = True) -> List[WorkerMemory]:
+        """Report unique vs. shared memory for the parent and each worker.
+
+        Parameters
+        ----------
+        include_parent : bool, default True
+            Whether to include the parent process as the first row.
+
+        Returns
+        -------
+        list of WorkerMemory
+            One row per live process whose counters could be read.
+        """
+        pids: List[Tuple[int, float]] = []
+        if include_parent:
+            pids.append((os.getpid(), 0.0))
+        for worker in self._workers:
+            if worker.proc.is_alive():
+                pids.append((worker.proc.pid, self._startup.get(worker.proc.pid, 0.0)))
+
+        report: List[WorkerMemory] = []
+        for pid, startup in pids:
+            counters = read_process_memory(pid)
+            if counters is None:
+                continue
+            report.append(WorkerMemory(
+                pid=pid,
+                rss_kb=counters.get("Rss", 0),
+                pss_kb=counters.get("Pss", 0),
+                unique_kb=counters.get("Private_Clean", 0)
+                + counters.get("Private_Dirty", 0),
+                shared_kb=counters.get("Shared_Clean", 0)
+                + counters.get("Shared_Dirty", 0),
+                startup_s=startup,
+            ))
+        return report
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop all workers."""
+        for worker in self._workers:
+            try:
+                worker.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for worker in self._workers:
+            worker.proc.join(timeout)
+            if worker.proc.is_alive():
+                worker.proc.terminate()
+            worker.conn.close()
+        self._workers = []
+        self._startup = {}
+        self._started = False
+        gc.unfreeze()
+
+    def __enter__(self) -> "SharedModelPool":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Score the sample strategies on forked workers sharing one model."
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--ohlc", default="vn30_ohlc_synthetic.csv")
+    parser.add_argument("--strategies", default="strategy_samples.json")
+    args = parser.parse_args()
+
+    from ohlc_validation import validate_ohlc
+    from run_risk_with_template import load_ohlc, load_strategies
+
+    validation = validate_ohlc(load_ohlc(args.ohlc))
+    ohlc_df = validation.data
+    for symbol in validation.quarantined:
+        reason = validation.report.loc[symbol, "reason"]
+        print(f"Warning: Quarantined symbol '{symbol}' ({reason}).")
+
+    strategies = [
+        s for s in load_strategies(args.strategies)
+        if (ohlc_df["symbol"] == s.symbol).any()
+    ]
+    jobs = [
+        (ohlc_df[ohlc_df["symbol"] == s.symbol][["close"]], s)
+        for s in strategies
+    ]
+
+    with SharedModelPool(n_workers=args.workers) as pool:
+        for strat, (score, mdd) in zip(strategies, pool.map(jobs)):
+            print(f"{strat.symbol}: Risk Score = {score}/100, E[MDD] = {mdd:.2%}")
+
+        print("\nPID       RSS(MB)  PSS(MB)  Unique(MB)  Shared(MB)  Startup(s)")
+        for row in pool.memory_report():
+            print(
+                f"{row.pid:<8}  {row.rss_kb / 1024:7.1f}  {row.pss_kb / 1024:7.1f}  "
+                f"{row.unique_kb / 1024:10.1f}  {row.shared_kb / 1024:10.1f}  "
+                f"{row.startup_s:10.3f}"
+            )